@@ -1,5 +1,9 @@
 import os
 import json
+import time
+import asyncio
+import concurrent.futures
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from google.adk.agents.llm_agent import LlmAgent
 from dotenv import load_dotenv 
@@ -34,85 +38,163 @@ DB_QUERY_AGENT_DESCRIPTION = "Agent to query invoice and purchase order database
 
 print(f"DB_QUERY_AGENT: Name='{DB_QUERY_AGENT_NAME}', Desc='{DB_QUERY_AGENT_DESCRIPTION}'")
 
+# Accepted document types, shared by every tool below instead of a per-call
+# list literal in each validation check.
+_VALID_DOC_TYPES = frozenset({"invoice", "purchase_order"})
+
+# Users often re-ask the same count/total within one conversation turn chain,
+# and each repeat costs a full SQLite round-trip. Cache read-only query
+# results for a short TTL; staleness is bounded by the TTL (set
+# DB_QUERY_CACHE_TTL=0 to disable) since ingestion happens in a separate
+# process and cannot invalidate this dict. An OrderedDict in LRU order: when
+# full, only the single least-recently-used entry is evicted instead of
+# dropping the whole cache and re-warming every hot query.
+_QUERY_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_QUERY_CACHE_TTL_SECONDS = float(os.getenv("DB_QUERY_CACHE_TTL", "30"))
+_QUERY_CACHE_MAX_ENTRIES = 256
+
+
+def _cache_store(cache_key: tuple, result) -> None:
+    if cache_key not in _QUERY_CACHE and len(_QUERY_CACHE) >= _QUERY_CACHE_MAX_ENTRIES:
+        _QUERY_CACHE.popitem(last=False)
+    _QUERY_CACHE[cache_key] = (time.monotonic() + _QUERY_CACHE_TTL_SECONDS, result)
+    _QUERY_CACHE.move_to_end(cache_key)
+
+
+# Keys with a background refresh already running, so an expired entry that
+# keeps getting asked for only spawns one refresh at a time.
+_QUERY_REFRESHING: set = set()
+
+
+# The query helpers never consult contextvars, so submit straight to a small
+# dedicated executor and wrap the future — same pattern as the orchestrator
+# agents' _db_call. asyncio.to_thread copies the caller's context on every call
+# and shares the process-wide default executor with every other to_thread user.
+_DB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="dbq")
+
+
+async def _db_query(cache_key: tuple, query_func, *args):
+    if _QUERY_CACHE_TTL_SECONDS <= 0:
+        return await asyncio.wrap_future(_DB_EXECUTOR.submit(query_func, *args))
+    # Monotonic clock: expiry math must not jump with NTP/wall-clock changes,
+    # and time.monotonic() is also cheaper than a wall-clock read per call.
+    now = time.monotonic()
+    entry = _QUERY_CACHE.get(cache_key)
+    if entry is not None:
+        _QUERY_CACHE.move_to_end(cache_key)
+        if entry[0] > now:
+            print(f"DB_QUERY_TOOL: Cache hit for {cache_key[0]}{cache_key[1:]}.")
+            return entry[1]
+        # Stale-while-revalidate: answer from the expired entry immediately
+        # and refresh it in the background, so TTL expiry never puts a full
+        # SQLite round-trip back on the caller's latency path.
+        if cache_key not in _QUERY_REFRESHING:
+            _QUERY_REFRESHING.add(cache_key)
+            asyncio.get_running_loop().create_task(_refresh_query(cache_key, query_func, args))
+        print(f"DB_QUERY_TOOL: Serving stale cache for {cache_key[0]}{cache_key[1:]} while refreshing.")
+        return entry[1]
+    result = await asyncio.wrap_future(_DB_EXECUTOR.submit(query_func, *args))
+    _cache_store(cache_key, result)
+    return result
+
+
+async def _refresh_query(cache_key: tuple, query_func, args) -> None:
+    try:
+        result = await asyncio.wrap_future(_DB_EXECUTOR.submit(query_func, *args))
+        _cache_store(cache_key, result)
+    except Exception as e:
+        # Keep serving the stale entry; the next expiry retries the refresh.
+        print(f"DB_QUERY_TOOL: Background refresh for {cache_key[0]}{cache_key[1:]} failed: {e}")
+    finally:
+        _QUERY_REFRESHING.discard(cache_key)
+
+
+def _query_error(tool_name: str, e: Exception) -> Dict[str, Any]:
+    """Logs one failed query tool call and returns the shared error payload."""
+    print(f"ERROR in {tool_name}: {e}\n{traceback.format_exc()}")
+    return {"status": "error", "message": f"Error querying database: {str(e)}"}
 
 
-def _get_doc_count_date_range_tool(document_type: str, start_date: str, end_date: str) -> Dict[str, Any]:
+async def _get_doc_count_date_range_tool(document_type: str, start_date: str, end_date: str) -> Dict[str, Any]:
     """
     Gets the count of documents (invoices or purchase_orders) within a specified date range.
     Dates should be in YYYY-MM-DD format.
     document_type must be 'invoice' or 'purchase_order'.
     """
     print(f"DB_QUERY_TOOL: _get_doc_count_date_range_tool called with type='{document_type}', start='{start_date}', end='{end_date}'")
-    if document_type.lower() not in ["invoice", "purchase_order"]: 
+    doc_type = document_type.lower()
+    if doc_type not in _VALID_DOC_TYPES:
         return {"status": "error", "message": "Invalid document_type. Must be 'invoice' or 'purchase_order'."}
     try:
-        # TODO: 
-        count = get_documents_count_by_date_range(document_type.lower(), start_date, end_date)
+        # The SQLite query is blocking; run it on the dedicated executor so
+        # the agent's event loop keeps serving other requests meanwhile.
+        count = await _db_query(("count_date_range", doc_type, start_date, end_date), get_documents_count_by_date_range, doc_type, start_date, end_date)
         return {"status": "success", "document_type": document_type, "start_date": start_date, "end_date": end_date, "count": count}
     except Exception as e:
-        print(f"ERROR in _get_doc_count_date_range_tool: {e}\n{traceback.format_exc()}")
-        return {"status": "error", "message": f"Error querying database: {str(e)}"}
+        return _query_error("_get_doc_count_date_range_tool", e)
 
-def _get_doc_count_vendor_tool(document_type: str, vendor_name: str) -> Dict[str, Any]:
+async def _get_doc_count_vendor_tool(document_type: str, vendor_name: str) -> Dict[str, Any]:
     """
     Gets the count of documents (invoices or purchase_orders) for a specific vendor name.
     document_type must be 'invoice' or 'purchase_order'.
     """
     print(f"DB_QUERY_TOOL: _get_doc_count_vendor_tool called with type='{document_type}', vendor='{vendor_name}'")
-    if document_type.lower() not in ["invoice", "purchase_order"]:
+    doc_type = document_type.lower()
+    if doc_type not in _VALID_DOC_TYPES:
         return {"status": "error", "message": "Invalid document_type. Must be 'invoice' or 'purchase_order'."}
     try:
-        count = get_documents_count_by_vendor(document_type.lower(), vendor_name)
+        count = await _db_query(("count_vendor", doc_type, vendor_name), get_documents_count_by_vendor, doc_type, vendor_name)
         return {"status": "success", "document_type": document_type, "vendor_name": vendor_name, "count": count}
     except Exception as e:
-        print(f"ERROR in _get_doc_count_vendor_tool: {e}\n{traceback.format_exc()}")
-        return {"status": "error", "message": f"Error querying database: {str(e)}"}
+        return _query_error("_get_doc_count_vendor_tool", e)
 
-def _get_total_amount_vendor_tool(document_type: str, vendor_name: str) -> Dict[str, Any]:
+async def _get_total_amount_vendor_tool(document_type: str, vendor_name: str) -> Dict[str, Any]:
     """
     Gets the total amount of documents (invoices or purchase_orders) for a specific vendor name.
     document_type must be 'invoice' or 'purchase_order'.
     """
     print(f"DB_QUERY_TOOL: _get_total_amount_vendor_tool called with type='{document_type}', vendor='{vendor_name}'")
-    if document_type.lower() not in ["invoice", "purchase_order"]:
+    doc_type = document_type.lower()
+    if doc_type not in _VALID_DOC_TYPES:
         return {"status": "error", "message": "Invalid document_type. Must be 'invoice' or 'purchase_order'."}
     try:
-        total_amount = get_total_amount_by_vendor(document_type.lower(), vendor_name)
+        total_amount = await _db_query(("total_vendor", doc_type, vendor_name), get_total_amount_by_vendor, doc_type, vendor_name)
         return {"status": "success", "document_type": document_type, "vendor_name": vendor_name, "total_amount": f"{total_amount:.2f}"} # Format as string
     except Exception as e:
-        print(f"ERROR in _get_total_amount_vendor_tool: {e}\n{traceback.format_exc()}")
-        return {"status": "error", "message": f"Error querying database: {str(e)}"}
+        return _query_error("_get_total_amount_vendor_tool", e)
 
-def _list_documents_vendor_tool(document_type: str, vendor_name: str, limit: int = 5) -> Dict[str, Any]:
+async def _list_documents_vendor_tool(document_type: str, vendor_name: str, limit: int = 5) -> Dict[str, Any]:
     """
     Lists documents (invoices or purchase_orders) for a specific vendor name, up to a limit.
     document_type must be 'invoice' or 'purchase_order'.
     """
     print(f"DB_QUERY_TOOL: _list_documents_vendor_tool called with type='{document_type}', vendor='{vendor_name}', limit={limit}")
-    if document_type.lower() not in ["invoice", "purchase_order"]:
+    doc_type = document_type.lower()
+    if doc_type not in _VALID_DOC_TYPES:
         return {"status": "error", "message": "Invalid document_type. Must be 'invoice' or 'purchase_order'."}
     try:
-        documents = get_documents_by_vendor(document_type.lower(), vendor_name)
-        return {"status": "success", "document_type": document_type, "vendor_name": vendor_name, "documents_found": len(documents), "documents_preview": documents[:limit]}
+        # Fetching and JSON-decoding the rows blocks; run it on the executor
+        # like the scalar query tools above.
+        documents = await _db_query(("list_vendor", doc_type, vendor_name, limit), get_documents_by_vendor, doc_type, vendor_name, limit)
+        return {"status": "success", "document_type": document_type, "vendor_name": vendor_name, "documents_found": len(documents), "documents_preview": documents}
     except Exception as e:
-        print(f"ERROR in _list_documents_vendor_tool: {e}\n{traceback.format_exc()}")
-        return {"status": "error", "message": f"Error querying database: {str(e)}"}
+        return _query_error("_list_documents_vendor_tool", e)
 
-def _list_documents_date_range_tool(document_type: str, start_date: str, end_date: str, limit: int = 5) -> Dict[str, Any]:
+async def _list_documents_date_range_tool(document_type: str, start_date: str, end_date: str, limit: int = 5) -> Dict[str, Any]:
     """
     Lists documents (invoices or purchase_orders) within a date range, up to a limit.
     Dates should be in YYYY-MM-DD format.
     document_type must be 'invoice' or 'purchase_order'.
     """
     print(f"DB_QUERY_TOOL: _list_documents_date_range_tool called with type='{document_type}', start='{start_date}', end='{end_date}', limit={limit}")
-    if document_type.lower() not in ["invoice", "purchase_order"]:
+    doc_type = document_type.lower()
+    if doc_type not in _VALID_DOC_TYPES:
         return {"status": "error", "message": "Invalid document_type. Must be 'invoice' or 'purchase_order'."}
     try:
-        documents = get_documents_by_date_range(document_type.lower(), start_date, end_date)
-        return {"status": "success", "document_type": document_type, "start_date": start_date, "end_date": end_date, "documents_found": len(documents), "documents_preview": documents[:limit]}
+        documents = await _db_query(("list_date_range", doc_type, start_date, end_date, limit), get_documents_by_date_range, doc_type, start_date, end_date, limit)
+        return {"status": "success", "document_type": document_type, "start_date": start_date, "end_date": end_date, "documents_found": len(documents), "documents_preview": documents}
     except Exception as e:
-        print(f"ERROR in _list_documents_date_range_tool: {e}\n{traceback.format_exc()}")
-        return {"status": "error", "message": f"Error querying database: {str(e)}"}
+        return _query_error("_list_documents_date_range_tool", e)
 
 
 
@@ -1,13 +1,14 @@
 import os
 import json
+import asyncio
 from typing import Dict, Any,List
 from google.adk.agents.llm_agent import LlmAgent
 
 import sys
 project_root_di = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root_di not in sys.path: sys.path.insert(0, project_root_di)
-from document_parser import process_raw_document_to_json
-from database_manager import store_invoice_data, store_po_data
+from document_parser import process_raw_document_to_json_async
+from database_manager import store_invoice_data, store_po_data, store_documents_batch
 import google.generativeai as genai
 
 
@@ -15,27 +16,38 @@ INGESTION_AGENT_HOST = os.getenv("DATA_INGESTION_AGENT_HOST", "localhost")
 INGESTION_AGENT_PORT = int(os.getenv("DATA_INGESTION_AGENT_PORT", 8001)) 
 
 
-class AgentCapability: 
+class AgentCapability:
+    __slots__ = ("name", "description", "_dict_cache")
     def __init__(self, name: str, description: str, input_schema=None, output_schema=None):
         self.name = name
         self.description = description
-        
-    def to_dict(self) -> Dict[str, Any]: 
-        return {"name": self.name, "description": self.description}
+        self._dict_cache: Dict[str, Any] = {}
 
-class AgentSkill: 
+    def to_dict(self) -> Dict[str, Any]:
+        # Immutable after construction, so serialize once like AgentCard below.
+        if not self._dict_cache:
+            self._dict_cache = {"name": self.name, "description": self.description}
+        return self._dict_cache
+
+class AgentSkill:
+    __slots__ = ("name", "description", "capabilities", "_dict_cache")
     def __init__(self, name: str, description: str, capabilities: List[AgentCapability]):
         self.name = name
         self.description = description
         self.capabilities = capabilities
-    def to_dict(self) -> Dict[str, Any]: 
-        return {
-            "name": self.name, 
-            "description": self.description, 
-            "capabilities": [cap.to_dict() for cap in self.capabilities]
-        }
-
-class AgentCard: 
+        self._dict_cache: Dict[str, Any] = {}
+    def to_dict(self) -> Dict[str, Any]:
+        if not self._dict_cache:
+            self._dict_cache = {
+                "name": self.name,
+                "description": self.description,
+                "capabilities": [cap.to_dict() for cap in self.capabilities]
+            }
+        return self._dict_cache
+
+class AgentCard:
+    __slots__ = ("name", "description", "url", "version", "defaultInputModes",
+                 "defaultOutputModes", "capabilities", "skills", "_dict_cache")
     def __init__(self, name: str, description: str, url: str, version: str, 
                  defaultInputModes: List[str], defaultOutputModes: List[str], 
                  capabilities: List[AgentCapability], 
@@ -46,11 +58,16 @@ class AgentCard:
         self.version = version
         self.defaultInputModes = defaultInputModes
         self.defaultOutputModes = defaultOutputModes
-        self.capabilities = capabilities 
-        self.skills = skills 
-
-    def to_dict(self) -> Dict[str, Any]: 
-        return {
+        self.capabilities = capabilities
+        self.skills = skills
+        self._dict_cache: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # The card never changes after construction, so compose the dict once
+        # and hand out the cached copy on discovery fetches.
+        if self._dict_cache:
+            return self._dict_cache
+        self._dict_cache = {
             "name": self.name,
             "description": self.description,
             "url": self.url,
@@ -60,6 +77,7 @@ class AgentCard:
             "capabilities": [cap.to_dict() for cap in self.capabilities],
             "skills": [skill.to_dict() for skill in self.skills]
         }
+        return self._dict_cache
 
 ingestion_capability = AgentCapability(
     name="_ingest_and_store_document_tool",
@@ -93,21 +111,95 @@ elif not getattr(genai, 'API_KEY', None) and os.getenv("GOOGLE_API_KEY"):
     except Exception as e: print(f"Error configuring GenAI in DataIngestionAgent: {e}")
 
 
-def _ingest_and_store_document_tool(raw_document_file_path: str, document_type: str) -> dict:
-    
+# Store function per normalized document type, resolved once at import.
+_STORE_FUNCS = {
+    "invoice": store_invoice_data,
+    "purchase_order": store_po_data,
+}
+
+async def _ingest_and_store_document_tool(raw_document_file_path: str, document_type: str) -> dict:
+
     print(f"DATA_INGESTION_TOOL: Processing file='{raw_document_file_path}', type='{document_type}'")
-    if document_type.lower() not in ["invoice", "purchase_order"]: return {"status": "error", "error_message": "Invalid document_type."}
-    extraction_result = process_raw_document_to_json(raw_document_file_path, document_type)
+    doc_type = document_type.lower()
+    store_func = _STORE_FUNCS.get(doc_type)
+    if store_func is None: return {"status": "error", "error_message": "Invalid document_type."}
+    # The Gemini extraction and the SQLite write are both blocking and can take
+    # seconds; run them in worker threads so the agent's event loop stays free.
+    extraction_result = await process_raw_document_to_json_async(raw_document_file_path, doc_type)
     if extraction_result.get("status") != "success": return {"status": "error", "error_message": f"Extraction failed: {extraction_result.get('error_message')}", "details": extraction_result }
-    doc_data = extraction_result.get("data"); doc_number_raw = doc_data.get("document_number") if doc_data else None
-    if not doc_number_raw: return {"status": "error", "error_message": "Doc number missing."}
-    doc_number = str(doc_number_raw).strip().upper()
-    if not doc_number: return {"status": "error", "error_message": "Doc number empty."}
-    stored = False
-    if document_type.lower() == "invoice": stored = store_invoice_data(doc_number, extraction_result)
-    elif document_type.lower() == "purchase_order": stored = store_po_data(doc_number, extraction_result)
-    if stored: return {"status": "success", "message": f"{document_type.capitalize()} '{doc_number}' stored.", "full_extraction_result": extraction_result }
-    else: return {"status": "error", "error_message": f"Failed to store {document_type} '{doc_number}'.", "full_extraction_result": extraction_result}
+    # Normalize first, then test once: "missing", None and whitespace-only all
+    # collapse to the empty string, so one check covers the old two.
+    doc_data = extraction_result.get("data")
+    doc_number = str(doc_data.get("document_number") or "").strip().upper() if doc_data else ""
+    if not doc_number: return {"status": "error", "error_message": "Doc number missing or empty."}
+    stored = await asyncio.to_thread(store_func, doc_number, extraction_result)
+    if stored: return {"status": "success", "message": f"{doc_type.capitalize()} '{doc_number}' stored.", "full_extraction_result": extraction_result }
+    else: return {"status": "error", "error_message": f"Failed to store {doc_type} '{doc_number}'.", "full_extraction_result": extraction_result}
+
+
+async def _ingest_and_store_documents_batch_tool(raw_document_file_paths: List[str], document_type: str) -> dict:
+    """Ingests several documents of one type in a single tool call.
+
+    The extractions are independent Gemini round-trips, so they run
+    concurrently; the results are then stored in one batched transaction
+    instead of one connection-and-commit per file.
+    """
+    print(f"DATA_INGESTION_TOOL: Batch processing {len(raw_document_file_paths)} file(s), type='{document_type}'")
+    doc_type = document_type.lower()
+    if doc_type not in _STORE_FUNCS: return {"status": "error", "error_message": "Invalid document_type."}
+    if not raw_document_file_paths: return {"status": "error", "error_message": "No file paths provided."}
+
+    # return_exceptions so one extraction blowing up doesn't discard the
+    # results of every other file in the batch; gather preserves input order,
+    # so zip pairs each outcome back to its path.
+    extraction_results = await asyncio.gather(
+        *(process_raw_document_to_json_async(path, doc_type) for path in raw_document_file_paths),
+        return_exceptions=True
+    )
+
+    to_store = []
+    per_file: List[Dict[str, Any]] = []
+    for path, extraction_result in zip(raw_document_file_paths, extraction_results):
+        if isinstance(extraction_result, BaseException):
+            if isinstance(extraction_result, asyncio.CancelledError):
+                raise extraction_result
+            per_file.append({"file_path": path, "status": "error", "error_message": f"Extraction raised {type(extraction_result).__name__}: {extraction_result}"})
+            continue
+        if extraction_result.get("status") != "success":
+            per_file.append({"file_path": path, "status": "error", "error_message": f"Extraction failed: {extraction_result.get('error_message')}"})
+            continue
+        doc_data = extraction_result.get("data")
+        doc_number = str(doc_data.get("document_number") or "").strip().upper() if doc_data else ""
+        if not doc_number:
+            per_file.append({"file_path": path, "status": "error", "error_message": "Doc number missing or empty."})
+            continue
+        to_store.append((doc_number, extraction_result))
+        per_file.append({"file_path": path, "status": "success", "document_number": doc_number})
+
+    stored_count = await asyncio.to_thread(store_documents_batch, doc_type, to_store) if to_store else 0
+    extraction_failures = len(per_file) - len(to_store)
+    # store_documents_batch is one all-or-nothing transaction, so a 0 with
+    # documents queued means the store step failed, not the extractions.
+    # Downgrade those entries and say so in the summary -- the orchestrating
+    # LLM acts on this report, and "success" rows alongside "0 failed
+    # extraction" would point it at the wrong step.
+    if to_store and stored_count == 0:
+        for entry in per_file:
+            if entry["status"] == "success":
+                entry["status"] = "error"
+                entry["error_message"] = "Extracted successfully but the batch database store failed."
+        return {
+            "status": "error",
+            "message": f"Extracted {len(to_store)} of {len(raw_document_file_paths)} {doc_type}(s) but the batch database store failed; {extraction_failures} failed extraction.",
+            "stored_count": 0,
+            "results": per_file
+        }
+    return {
+        "status": "success" if stored_count == len(raw_document_file_paths) else ("error" if stored_count == 0 else "partial"),
+        "message": f"Stored {stored_count} of {len(raw_document_file_paths)} {doc_type}(s); {extraction_failures} failed extraction.",
+        "stored_count": stored_count,
+        "results": per_file
+    }
 
 
 
@@ -121,11 +213,14 @@ data_ingestion_llm_agent = LlmAgent(
         "The Orchestrator's message will implicitly (or explicitly if formatted as a tool call) "
         "tell you to use your `_ingest_and_store_document_tool` and will provide "
         "`raw_document_file_path` and `document_type` as arguments.\n"
+        "If the request provides SEVERAL file paths of the same document type, use "
+        "`_ingest_and_store_documents_batch_tool` with `raw_document_file_paths` (a list) "
+        "and `document_type` instead of calling the single-file tool repeatedly.\n"
         "Your ONLY task is to call this tool with the provided arguments "
         "and return its complete JSON result. Do not add any conversational fluff or summaries. "
         "The Orchestrator expects the raw JSON output of your tool."
     ),
-    tools=[_ingest_and_store_document_tool]
+    tools=[_ingest_and_store_document_tool, _ingest_and_store_documents_batch_tool]
 )
 
 
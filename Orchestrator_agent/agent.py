@@ -5,6 +5,7 @@ from google.adk.agents.llm_agent import LlmAgent
 from dotenv import load_dotenv
 import traceback
 import asyncio
+import concurrent.futures
 import httpx
 import uuid
 import pydantic
@@ -115,13 +116,99 @@ elif not getattr(genai, 'API_KEY', None) and os.getenv("GOOGLE_API_KEY"):
     except Exception as e: print(f"Error configuring GenAI in OrchestratorAgent: {e}")
 
 
-async def _get_shared_httpx_client() -> httpx.AsyncClient:
+# Whether the SDK pieces the tool needs all imported. The answer cannot change
+# after import, so decide once here instead of re-running the all([...]) probe
+# on every tool invocation.
+_A2A_TYPES_AVAILABLE = all([DiscoveredA2AClientClass, SendMessageRequest, MessageSendParams, Message, Part, Role])
+
+
+def _get_shared_httpx_client() -> httpx.AsyncClient:
+    # Plain function: it only hands back the module-level singleton, so there
+    # is no reason to allocate a coroutine per lookup.
     global shared_httpx_client
     if shared_httpx_client is None or shared_httpx_client.is_closed:
         print("INFO: Creating new shared httpx.AsyncClient instance.")
-        shared_httpx_client = httpx.AsyncClient()
+        # Keep-alive limits sized for the handful of sub-agent endpoints this
+        # orchestrator talks to; reused connections skip per-call handshakes.
+        shared_httpx_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
     return shared_httpx_client
 
+# SDK client per target URL. Building a client per delegation re-runs the
+# pydantic construction each time for what is effectively a constant; reuse
+# the instance as long as it is still bound to the current shared httpx client.
+_a2a_clients: Dict[str, tuple] = {}
+
+def _get_a2a_client(http_client: httpx.AsyncClient, target_url: str):
+    cached = _a2a_clients.get(target_url)
+    if cached is not None and cached[0] is http_client:
+        return cached[1]
+    client = DiscoveredA2AClientClass(httpx_client=http_client, url=target_url)
+    _a2a_clients[target_url] = (http_client, client)
+    return client
+
+# The DB helpers never consult contextvars, so submit straight to a small
+# dedicated executor and wrap the future. asyncio.to_thread copies the caller's
+# context on every call and shares the process-wide default executor with every
+# other to_thread user.
+_DB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="orch-db")
+
+def _db_call(func, *args):
+    return asyncio.wrap_future(_DB_EXECUTOR.submit(func, *args))
+
+def _extract_document_number(extraction_obj) -> str:
+    """Reads data.document_number out of an extraction payload, normalized to
+    the stripped upper-case form used as document keys ("" when absent)."""
+    if type(extraction_obj) is not dict:
+        return ""
+    value = extraction_obj.get("data", {}).get("document_number")
+    if value is None:
+        return ""
+    # json-decoded numbers are already str in the common case; skip the copy.
+    s = value if type(value) is str else str(value)
+    return s.strip().upper()
+
+def _finalize_error(final_report: Dict[str, Any], error_message: str, step_msg: str, print_msg: Optional[str] = None) -> Dict[str, Any]:
+    """Records a failed step on the report and returns it; the error exits in
+    the tool below all shared this same four-statement tail."""
+    final_report["overall_status"] = "error"
+    final_report["error_message"] = error_message
+    final_report["steps_taken"].append(step_msg)
+    print(f"ORCHESTRATOR: {print_msg or step_msg}")
+    return final_report
+
+async def _send_a2a_tool_request(agent_client, tool_invocation_text: str, label: str, target_url: str) -> dict:
+    """Builds, sends and parses one A2A tool request; returns the tool's JSON dict.
+
+    All three delegation sites (PO ingestion, invoice ingestion, reconciliation)
+    previously carried their own copy of this scaffolding.
+    """
+    try:
+        msg = Message(messageId=str(uuid.uuid4()), parts=[Part(text=tool_invocation_text)], role=Role.user)
+        payload = SendMessageRequest(params=MessageSendParams(message=msg), id=str(uuid.uuid4()))
+        print(f"ORCHESTRATOR: Sending A2A {label} request to {target_url}")
+        response_sdk_obj = await agent_client.send_message(request=payload)
+        response_message = getattr(response_sdk_obj, 'message', None)
+        response_error = getattr(response_sdk_obj, 'error', None)
+        if response_message is not None and getattr(response_message, 'parts', None):
+            response_text = response_message.parts[0].text
+            print(f"ORCHESTRATOR: Received A2A {label} response: {response_text[:200]}...")
+            return json.loads(response_text)
+        elif response_error is not None:
+            return {"status": "error", "error_message": f"A2A {label} call failed - agent error: {response_error.message}"}
+        return {"status": "error", "error_message": f"A2A {label} call failed - unexpected response structure"}
+    except pydantic.ValidationError as ve:
+        print(f"PYDANTIC ERROR ({label} request): {ve}")
+        return {"status": "error", "error_message": f"Pydantic validation error creating A2A {label} request: {ve}"}
+    except json.JSONDecodeError as e:
+        return {"status": "error", "error_message": f"Invalid JSON response from A2A ({label}): {str(e)}"}
+    except Exception as e:
+        print(traceback.format_exc())
+        # The full traceback is printed above; the returned message goes into
+        # the report (and back to the LLM), so keep it to the summary line.
+        return {"status": "error", "error_message": f"A2A {label} communication error: {str(e)}"}
+
 async def _orchestrate_po_reconciliation_tool(
     po_number_input: str,
     new_po_file_path: Optional[str] = None,
@@ -130,16 +217,17 @@ async def _orchestrate_po_reconciliation_tool(
     print(f"ORCHESTRATOR_A2A_TOOL: po_number='{po_number_input}', "
           f"new_po_file='{new_po_file_path}', new_inv_file='{new_invoice_file_path}'")
 
-    if not all([DiscoveredA2AClientClass, SendMessageRequest, MessageSendParams, Message, Part, Role]):
+    if not _A2A_TYPES_AVAILABLE:
         return {
             "status": "error",
             "error_message": "A2A client components or core types not initialized. Check imports."
         }
 
-    http_client = await _get_shared_httpx_client()
+    http_client = _get_shared_httpx_client()
     final_report: Dict[str, Any] = {"steps_taken": [], "overall_status": "pending"}
     po_extraction_full_obj: Optional[Dict[str, Any]] = None
     invoice_extraction_full_obj: Optional[Dict[str, Any]] = None
+    prefetched_invoice_response: Optional[Dict[str, Any]] = None
 
     po_number_to_process = po_number_input.strip().upper() if po_number_input else None
     if not po_number_to_process:
@@ -147,7 +235,9 @@ async def _orchestrate_po_reconciliation_tool(
 
     step_msg_po = f"Step 1: Acquiring PO '{po_number_to_process}'."
     final_report["steps_taken"].append(step_msg_po); print(f"ORCHESTRATOR: {step_msg_po}")
-    po_from_db = get_po_by_number(po_number_to_process)
+    # SQLite access is blocking; keep it off the event loop so concurrent
+    # orchestrations aren't stalled behind each other's disk reads.
+    po_from_db = await _db_call(get_po_by_number, po_number_to_process)
     ingestion_response_dict = {}
 
     if po_from_db:
@@ -157,40 +247,28 @@ async def _orchestrate_po_reconciliation_tool(
     elif new_po_file_path:
         step_msg_po += f" Not in DB. Delegating ingestion of new file '{new_po_file_path}'."
         ingestion_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_po_file_path, 'document_type': 'purchase_order'})}"
-        try:
-            msg_parts_po = [Part(text=ingestion_tool_text)]
-            actual_msg_obj_po = Message(
-                messageId=str(uuid.uuid4()),
-                parts=msg_parts_po,
-                role=Role.user
+        ingestion_agent_client = _get_a2a_client(http_client, DATA_INGESTION_AGENT_URL)
+        po_request = _send_a2a_tool_request(
+            ingestion_agent_client, ingestion_tool_text, "PO", DATA_INGESTION_AGENT_URL
+        )
+        if new_invoice_file_path:
+            # The invoice ingestion doesn't depend on the PO result, so when
+            # both new files are provided run the two delegations concurrently
+            # instead of paying two sequential round-trips. Ingestion is an
+            # INSERT OR REPLACE, so storing the invoice up front is harmless
+            # even if the PO leg fails.
+            invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
+            ingestion_response_dict, prefetched_invoice_response = await asyncio.gather(
+                po_request,
+                _send_a2a_tool_request(ingestion_agent_client, invoice_tool_text, "Invoice", DATA_INGESTION_AGENT_URL)
             )
-            msg_params_po = MessageSendParams(message=actual_msg_obj_po)
-            a2a_payload_po = SendMessageRequest(params=msg_params_po, id=str(uuid.uuid4()))
-            ingestion_agent_client = DiscoveredA2AClientClass(httpx_client=http_client, url=DATA_INGESTION_AGENT_URL)
-            print(f"ORCHESTRATOR: Sending A2A PO request to {DATA_INGESTION_AGENT_URL}")
-            ingestion_response_sdk_obj = await ingestion_agent_client.send_message(request=a2a_payload_po)
-            if ingestion_response_sdk_obj and hasattr(ingestion_response_sdk_obj, 'message') and ingestion_response_sdk_obj.message and hasattr(ingestion_response_sdk_obj.message, 'parts') and ingestion_response_sdk_obj.message.parts:
-                response_text = ingestion_response_sdk_obj.message.parts[0].text
-                print(f"ORCHESTRATOR: Received A2A PO response: {response_text[:200]}...")
-                ingestion_response_dict = json.loads(response_text)
-            elif ingestion_response_sdk_obj and hasattr(ingestion_response_sdk_obj, 'error') and ingestion_response_sdk_obj.error:
-                ingestion_response_dict = {"status": "error", "error_message": f"A2A PO call failed - agent error: {ingestion_response_sdk_obj.error.message}"}
-            else:
-                ingestion_response_dict = {"status": "error", "error_message": "A2A PO call failed - unexpected response structure"}
-        except pydantic.ValidationError as ve:
-            ingestion_response_dict = {"status": "error", "error_message": f"Pydantic validation error creating A2A PO request: {ve}"}
-            print(f"PYDANTIC ERROR (PO Ingestion): {ve}")
-        except json.JSONDecodeError as e:
-            ingestion_response_dict = {"status": "error", "error_message": f"Invalid JSON response from A2A (PO): {str(e)}"}
-        except Exception as e:
-            ingestion_response_dict = {"status": "error", "error_message": f"A2A PO communication error: {str(e)} \n{traceback.format_exc()}"}
-            print(traceback.format_exc())
+        else:
+            ingestion_response_dict = await po_request
         final_report["po_acquisition"] = ingestion_response_dict
         if ingestion_response_dict.get("status") == "success":
             po_extraction_full_obj = ingestion_response_dict.get("full_extraction_result")
-            if po_extraction_full_obj and isinstance(po_extraction_full_obj, dict):
-                extracted_po_num_obj = po_extraction_full_obj.get("data",{}).get("document_number")
-                extracted_po_num = str(extracted_po_num_obj).strip().upper() if extracted_po_num_obj is not None else ""
+            if po_extraction_full_obj and type(po_extraction_full_obj) is dict:
+                extracted_po_num = _extract_document_number(po_extraction_full_obj)
                 if extracted_po_num and extracted_po_num != po_number_to_process:
                     step_msg_po += f" File extracted as PO '{extracted_po_num}'. Using this."
                     po_number_to_process = extracted_po_num
@@ -198,11 +276,11 @@ async def _orchestrate_po_reconciliation_tool(
             else:
                 ingestion_response_dict["status"] = "error"
                 ingestion_response_dict["error_message"] = "A2A PO ingestion succeeded but response format was unexpected."
-                final_report["overall_status"] = "error"; final_report["error_message"] = ingestion_response_dict["error_message"]
-                final_report["steps_taken"].append(step_msg_po + " - Error in response format"); print(f"ORCHESTRATOR: {step_msg_po} - Error in response format"); return final_report
+                return _finalize_error(final_report, ingestion_response_dict["error_message"],
+                                       step_msg_po + " - Error in response format")
         else:
-            final_report["overall_status"] = "error"; final_report["error_message"] = f"A2A PO ingestion failed: {ingestion_response_dict.get('error_message', 'Unknown error')}"
-            final_report["steps_taken"].append(step_msg_po); print(f"ORCHESTRATOR: {step_msg_po} - Error"); return final_report
+            return _finalize_error(final_report, f"A2A PO ingestion failed: {ingestion_response_dict.get('error_message', 'Unknown error')}",
+                                   step_msg_po, step_msg_po + " - Error")
     else:
         step_msg_po += f" PO '{po_number_to_process}' not found in DB and no new file provided."
         final_report["overall_status"] = "po_not_found_needs_file"; final_report["message_to_user"] = step_msg_po
@@ -212,9 +290,7 @@ async def _orchestrate_po_reconciliation_tool(
     if not po_extraction_full_obj:
         final_report["overall_status"] = "error"; final_report["error_message"] = "Critical: PO data object is missing after acquisition attempts."
         return final_report
-    confirmed_po_number = ""
-    if isinstance(po_extraction_full_obj, dict) and "data" in po_extraction_full_obj:
-        confirmed_po_number = str(po_extraction_full_obj.get("data", {}).get("document_number", "")).strip().upper()
+    confirmed_po_number = _extract_document_number(po_extraction_full_obj)
     if not confirmed_po_number and po_number_to_process :
          confirmed_po_number = po_number_to_process
     if not confirmed_po_number:
@@ -226,53 +302,32 @@ async def _orchestrate_po_reconciliation_tool(
     ingestion_response_dict_inv = {}
     if new_invoice_file_path:
         step_msg_inv += f" Delegating ingestion of new invoice file '{new_invoice_file_path}'."
-        invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
-        try:
-            msg_parts_inv = [Part(text=invoice_tool_text)]
-            actual_msg_obj_inv = Message(
-                messageId=str(uuid.uuid4()),
-                parts=msg_parts_inv,
-                role=Role.user
+        if prefetched_invoice_response is not None:
+            # Already ingested concurrently with the PO leg above.
+            ingestion_response_dict_inv = prefetched_invoice_response
+        else:
+            invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
+            invoice_agent_client = _get_a2a_client(http_client, DATA_INGESTION_AGENT_URL)
+            ingestion_response_dict_inv = await _send_a2a_tool_request(
+                invoice_agent_client, invoice_tool_text, "Invoice", DATA_INGESTION_AGENT_URL
             )
-            msg_params_inv = MessageSendParams(message=actual_msg_obj_inv)
-            a2a_payload_inv = SendMessageRequest(params=msg_params_inv, id=str(uuid.uuid4()))
-            invoice_agent_client = DiscoveredA2AClientClass(httpx_client=http_client, url=DATA_INGESTION_AGENT_URL)
-            print(f"ORCHESTRATOR: Sending A2A invoice request to {DATA_INGESTION_AGENT_URL}")
-            ingestion_response_inv_sdk_obj = await invoice_agent_client.send_message(request=a2a_payload_inv)
-            if ingestion_response_inv_sdk_obj and hasattr(ingestion_response_inv_sdk_obj, 'message') and ingestion_response_inv_sdk_obj.message and hasattr(ingestion_response_inv_sdk_obj.message, 'parts') and ingestion_response_inv_sdk_obj.message.parts:
-                response_text_inv = ingestion_response_inv_sdk_obj.message.parts[0].text
-                print(f"ORCHESTRATOR: Received A2A invoice response: {response_text_inv[:200]}...")
-                ingestion_response_dict_inv = json.loads(response_text_inv)
-            elif ingestion_response_inv_sdk_obj and hasattr(ingestion_response_inv_sdk_obj, 'error') and ingestion_response_inv_sdk_obj.error:
-                ingestion_response_dict_inv = {"status": "error", "error_message": f"A2A Invoice call failed - agent error: {ingestion_response_inv_sdk_obj.error.message}"}
-            else:
-                ingestion_response_dict_inv = {"status": "error", "error_message": "A2A Invoice call failed - unexpected response structure"}
-        except pydantic.ValidationError as ve:
-            ingestion_response_dict_inv = {"status": "error", "error_message": f"Pydantic validation error creating A2A Invoice request: {ve}"}
-            print(f"PYDANTIC ERROR (Invoice Ingestion): {ve}")
-        except json.JSONDecodeError as e:
-            ingestion_response_dict_inv = {"status": "error", "error_message": f"Invalid JSON response from A2A (Invoice): {str(e)}"}
-        except Exception as e:
-            ingestion_response_dict_inv = {"status": "error", "error_message": f"A2A Invoice communication error: {str(e)} \n{traceback.format_exc()}"}
-            print(traceback.format_exc())
         final_report["invoice_acquisition"] = ingestion_response_dict_inv
         if ingestion_response_dict_inv.get("status") == "success":
             invoice_extraction_full_obj = ingestion_response_dict_inv.get("full_extraction_result")
-            if not (invoice_extraction_full_obj and isinstance(invoice_extraction_full_obj, dict)):
+            if not (invoice_extraction_full_obj and type(invoice_extraction_full_obj) is dict):
                  ingestion_response_dict_inv["status"] = "error"
                  ingestion_response_dict_inv["error_message"] = "A2A Invoice ingestion succeeded but response format was unexpected."
-                 final_report["overall_status"] = "error"; final_report["error_message"] = ingestion_response_dict_inv["error_message"]
-                 final_report["steps_taken"].append(step_msg_inv + " - Error in response format"); print(f"ORCHESTRATOR: {step_msg_inv} - Error in response format"); return final_report
+                 return _finalize_error(final_report, ingestion_response_dict_inv["error_message"],
+                                        step_msg_inv + " - Error in response format")
             step_msg_inv += " Successfully ingested new invoice via A2A."
         else:
-            final_report["overall_status"] = "error"; final_report["error_message"] = f"A2A Invoice ingestion failed: {ingestion_response_dict_inv.get('error_message', 'Unknown error')}"
-            final_report["steps_taken"].append(step_msg_inv); print(f"ORCHESTRATOR: {step_msg_inv} - Error"); return final_report
+            return _finalize_error(final_report, f"A2A Invoice ingestion failed: {ingestion_response_dict_inv.get('error_message', 'Unknown error')}",
+                                   step_msg_inv, step_msg_inv + " - Error")
     else:
         step_msg_inv += f" Searching DB for invoice related to PO '{confirmed_po_number}'."
-        invoice_extraction_full_obj = get_invoice_by_related_po(confirmed_po_number)
+        invoice_extraction_full_obj = await _db_call(get_invoice_by_related_po, confirmed_po_number)
         if invoice_extraction_full_obj:
-            inv_num_found_obj = invoice_extraction_full_obj.get('data',{}).get('document_number', 'UNKNOWN')
-            inv_num_found = str(inv_num_found_obj)
+            inv_num_found = _extract_document_number(invoice_extraction_full_obj) or "UNKNOWN"
             step_msg_inv += f" Found related invoice '{inv_num_found}' in DB."
             final_report["invoice_acquisition"] = {"status": "success_from_db_related_to_po", "source": "database", "document_number": inv_num_found}
         else:
@@ -289,34 +344,10 @@ async def _orchestrate_po_reconciliation_tool(
     final_report["steps_taken"].append(step_msg_reco); print(f"ORCHESTRATOR: {step_msg_reco}")
     reco_response_dict = {}
     reco_tool_invocation_text = f"_perform_reconciliation_logic_tool: {json.dumps({'invoice_data_json_str': json.dumps(invoice_extraction_full_obj), 'po_data_json_str': json.dumps(po_extraction_full_obj)})}"
-    try:
-        msg_parts_reco = [Part(text=reco_tool_invocation_text)]
-        actual_msg_obj_reco = Message(
-            messageId=str(uuid.uuid4()),
-            parts=msg_parts_reco,
-            role=Role.user
-        )
-        msg_params_reco = MessageSendParams(message=actual_msg_obj_reco)
-        a2a_payload_reco = SendMessageRequest(params=msg_params_reco, id=str(uuid.uuid4()))
-        reco_agent_client = DiscoveredA2AClientClass(httpx_client=http_client, url=RECONCILIATION_AGENT_URL)
-        print(f"ORCHESTRATOR: Sending A2A reconciliation request to {RECONCILIATION_AGENT_URL}")
-        reco_response_sdk_obj = await reco_agent_client.send_message(request=a2a_payload_reco)
-        if reco_response_sdk_obj and hasattr(reco_response_sdk_obj, 'message') and reco_response_sdk_obj.message and hasattr(reco_response_sdk_obj.message, 'parts') and reco_response_sdk_obj.message.parts:
-            response_text_reco = reco_response_sdk_obj.message.parts[0].text
-            print(f"ORCHESTRATOR: Received A2A reconciliation response: {response_text_reco[:200]}...")
-            reco_response_dict = json.loads(response_text_reco)
-        elif reco_response_sdk_obj and hasattr(reco_response_sdk_obj, 'error') and reco_response_sdk_obj.error:
-            reco_response_dict = {"status": "error", "error_message": f"A2A Reconciliation call failed - agent error: {reco_response_sdk_obj.error.message}"}
-        else:
-            reco_response_dict = {"status": "error", "error_message": "A2A Reconciliation call failed - unexpected response structure"}
-    except pydantic.ValidationError as ve:
-        reco_response_dict = {"status": "error", "error_message": f"Pydantic validation error creating A2A Reconciliation request: {ve}"}
-        print(f"PYDANTIC ERROR (Reconciliation): {ve}")
-    except json.JSONDecodeError as e:
-        reco_response_dict = {"status": "error", "error_message": f"Invalid JSON response from A2A (Reconciliation): {str(e)}"}
-    except Exception as e:
-        reco_response_dict = {"status": "error", "error_message": f"A2A Reconciliation communication error: {str(e)} \n{traceback.format_exc()}"}
-        print(traceback.format_exc())
+    reco_agent_client = _get_a2a_client(http_client, RECONCILIATION_AGENT_URL)
+    reco_response_dict = await _send_a2a_tool_request(
+        reco_agent_client, reco_tool_invocation_text, "Reconciliation", RECONCILIATION_AGENT_URL
+    )
     final_report["reconciliation_report"] = reco_response_dict
     if reco_response_dict.get("status") == "success":
         final_report["overall_status"] = "success_reconciled"; final_report["message"] = "Reconciliation complete."
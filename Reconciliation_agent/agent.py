@@ -1,13 +1,16 @@
 import os
 import json
+import time
 from typing import Dict, Any, Optional, List
 from google.adk.agents.llm_agent import LlmAgent
 from dotenv import load_dotenv
 import traceback
 import asyncio
+import concurrent.futures
 import httpx
 import uuid
 import pydantic
+from urllib.parse import urljoin
 
 import sys
 project_root_orch = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -104,21 +107,70 @@ elif not getattr(genai, 'API_KEY', None) and os.getenv("GOOGLE_API_KEY"):
     except Exception as e: print(f"Error configuring GenAI in OrchestratorAgent: {e}")
 
 
-async def _get_shared_httpx_client() -> httpx.AsyncClient:
+# Whether the SDK pieces the tool needs all imported. The answer cannot change
+# after import, so decide once here instead of re-running the all([...]) probe
+# on every tool invocation.
+_A2A_TYPES_AVAILABLE = all([DiscoveredA2AClientClass, SendMessageRequest, MessageSendParams, Message, Part, Role, A2ACardResolverClass])
+
+
+def _get_shared_httpx_client() -> httpx.AsyncClient:
+    # Plain function: it only hands back the module-level singleton, so there
+    # is no reason to allocate a coroutine per lookup.
     global shared_httpx_client
     if shared_httpx_client is None or shared_httpx_client.is_closed:
         print("INFO: Creating new shared httpx.AsyncClient instance.")
-        shared_httpx_client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0)) 
+        # Keep-alive limits sized for the handful of sub-agent endpoints this
+        # orchestrator talks to; reused connections skip per-call handshakes.
+        shared_httpx_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        ) 
     return shared_httpx_client
 
+# Resolved A2A clients keyed by agent base URL. Resolving the AgentCard costs a
+# network round-trip per call, but the card's RPC URL is stable, so reuse the
+# client as long as it is still bound to the current shared httpx client.
+# Entries expire after a TTL so a redeployed agent whose card moved its RPC URL
+# is picked up without restarting this process (A2A_CARD_CACHE_TTL=0 disables
+# caching entirely).
+_resolved_a2a_clients: Dict[str, tuple] = {}
+_CARD_CACHE_TTL_SECONDS = float(os.getenv("A2A_CARD_CACHE_TTL", "300"))
+
+# Single-flight: concurrent callers hitting a cold/expired cache entry share
+# one in-flight resolution task instead of each firing its own card fetch.
+_card_resolutions_inflight: Dict[str, asyncio.Task] = {}
+
 async def _resolve_and_get_a2a_client(
     http_client: httpx.AsyncClient,
     agent_base_url: str,
     target_agent_name_for_logging: str
-) -> Optional[Any]: 
+) -> Optional[Any]:
     if not A2ACardResolverClass or not DiscoveredA2AClientClass:
         print(f"ERROR ({target_agent_name_for_logging}): A2ACardResolver or A2AClient class not available for dynamic discovery.")
         return None
+    cached = _resolved_a2a_clients.get(agent_base_url)
+    # Monotonic clock for expiry: immune to wall-clock adjustments.
+    if cached is not None and cached[0] is http_client and cached[2] > time.monotonic():
+        return cached[1]
+    inflight = _card_resolutions_inflight.get(agent_base_url)
+    if inflight is not None:
+        # Shield: one awaiting caller being cancelled must not cancel the
+        # shared resolution out from under the others.
+        return await asyncio.shield(inflight)
+    task = asyncio.ensure_future(
+        _resolve_card_and_build_client(http_client, agent_base_url, target_agent_name_for_logging)
+    )
+    _card_resolutions_inflight[agent_base_url] = task
+    try:
+        return await asyncio.shield(task)
+    finally:
+        _card_resolutions_inflight.pop(agent_base_url, None)
+
+async def _resolve_card_and_build_client(
+    http_client: httpx.AsyncClient,
+    agent_base_url: str,
+    target_agent_name_for_logging: str
+) -> Optional[Any]:
     try:
         print(f"ORCHESTRATOR: Resolving AgentCard for {target_agent_name_for_logging} at base URL: {agent_base_url}")
         resolver = A2ACardResolverClass(httpx_client=http_client, base_url=agent_base_url)
@@ -127,16 +179,19 @@ async def _resolve_and_get_a2a_client(
             rpc_url = agent_card_sdk_obj.url
             # Ensure RPC URL is absolute; if relative, combine with base_url (though AgentCard.url should be absolute)
             if not rpc_url.startswith(('http://', 'https://')):
-                from urllib.parse import urljoin
                 rpc_url = urljoin(agent_base_url + ('/' if not agent_base_url.endswith('/') else ''), rpc_url.lstrip('/'))
                 print(f"ORCHESTRATOR: Constructed absolute RPC URL for {target_agent_name_for_logging}: {rpc_url}")
 
             print(f"ORCHESTRATOR: Resolved AgentCard for {target_agent_name_for_logging}. RPC URL from card: {rpc_url}")
-            return DiscoveredA2AClientClass(httpx_client=http_client, url=rpc_url) # Use url from card
+            resolved_client = DiscoveredA2AClientClass(httpx_client=http_client, url=rpc_url) # Use url from card
+            _resolved_a2a_clients[agent_base_url] = (http_client, resolved_client, time.monotonic() + _CARD_CACHE_TTL_SECONDS)
+            return resolved_client
         else:
             err_msg = f"Failed to get a valid AgentCard or RPC URL from {agent_base_url}."
             if agent_card_sdk_obj:
-                 err_msg += f" Card fetched but URL missing/invalid. Card content: {agent_card_sdk_obj.model_dump_json()}"
+                 # Bound the dumped card; a pathological card would otherwise
+                 # render megabytes into this one log line.
+                 err_msg += f" Card fetched but URL missing/invalid. Card content: {agent_card_sdk_obj.model_dump_json()[:500]}"
             print(f"ERROR ({target_agent_name_for_logging}): {err_msg}")
             return None
     except Exception as e_resolve:
@@ -144,6 +199,74 @@ async def _resolve_and_get_a2a_client(
         print(traceback.format_exc())
         return None
 
+# The DB helpers never consult contextvars, so submit straight to a small
+# dedicated executor and wrap the future. asyncio.to_thread copies the caller's
+# context on every call and shares the process-wide default executor with every
+# other to_thread user.
+_DB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="orch-db")
+
+def _db_call(func, *args):
+    return asyncio.wrap_future(_DB_EXECUTOR.submit(func, *args))
+
+def _extract_document_number(extraction_obj) -> str:
+    """Reads data.document_number out of an extraction payload, normalized to
+    the stripped upper-case form used as document keys ("" when absent)."""
+    if type(extraction_obj) is not dict:
+        return ""
+    value = extraction_obj.get("data", {}).get("document_number")
+    if value is None:
+        return ""
+    # json-decoded numbers are already str in the common case; skip the copy.
+    s = value if type(value) is str else str(value)
+    return s.strip().upper()
+
+def _finalize_error(final_report: Dict[str, Any], error_message: str, step_msg: str, print_msg: Optional[str] = None) -> Dict[str, Any]:
+    """Records a failed step on the report and returns it; the error exits in
+    the tool below all shared this same four-statement tail."""
+    final_report["overall_status"] = "error"
+    final_report["error_message"] = error_message
+    final_report["steps_taken"].append(step_msg)
+    print(f"ORCHESTRATOR: {print_msg or step_msg}")
+    return final_report
+
+async def _send_a2a_tool_request(a2a_client: Any, tool_invocation_text: str, label: str) -> dict:
+    """Builds the SendMessageRequest for one tool invocation, sends it via the
+    resolved client and normalizes the response (or any failure) into the
+    status/error_message dict shape the orchestration flow expects. The PO,
+    invoice and reconciliation delegations all share this path."""
+    try:
+        msg_parts = [Part(text=tool_invocation_text)]
+        actual_msg_obj = Message(messageId=str(uuid.uuid4()), parts=msg_parts, role=Role.user)
+        msg_params = MessageSendParams(message=actual_msg_obj)
+        a2a_payload = SendMessageRequest(params=msg_params, id=str(uuid.uuid4()))
+
+        print(f"ORCHESTRATOR: Sending A2A {label} request via resolved client to {getattr(a2a_client, 'url', 'unknown URL')}")
+        response_sdk_obj = await a2a_client.send_message(request=a2a_payload)
+
+        # Probe the optional SDK attributes once per response instead of
+        # hasattr-ing each of them again at every use below.
+        response_message = getattr(response_sdk_obj, 'message', None) if response_sdk_obj else None
+        response_error = getattr(response_sdk_obj, 'error', None) if response_sdk_obj else None
+        if response_message is not None and getattr(response_message, 'parts', None):
+            response_text = response_message.parts[0].text
+            print(f"ORCHESTRATOR: Received A2A {label} response: {response_text[:200]}...")
+            return json.loads(response_text)
+        elif response_error is not None:
+            error_detail = getattr(response_error, 'details', None) or response_error.message
+            return {"status": "error", "error_message": f"A2A {label} call failed - agent error: {error_detail}"}
+        else:
+            return {"status": "error", "error_message": f"A2A {label} call failed - unexpected response structure"}
+    except pydantic.ValidationError as ve:
+        print(f"PYDANTIC ERROR ({label}): {ve}")
+        return {"status": "error", "error_message": f"Pydantic validation error creating A2A {label} request: {ve}"}
+    except json.JSONDecodeError as e:
+        return {"status": "error", "error_message": f"Invalid JSON response from A2A ({label}): {str(e)}"}
+    except Exception as e:
+        print(traceback.format_exc())
+        # The full traceback is printed above; the returned message goes into
+        # the report (and back to the LLM), so keep it to the summary line.
+        return {"status": "error", "error_message": f"A2A {label} communication error: {str(e)}"}
+
 async def _orchestrate_po_reconciliation_tool(
     po_number_input: str,
     new_po_file_path: Optional[str] = None,
@@ -152,16 +275,17 @@ async def _orchestrate_po_reconciliation_tool(
     print(f"ORCHESTRATOR_A2A_TOOL: po_number='{po_number_input}', "
           f"new_po_file='{new_po_file_path}', new_inv_file='{new_invoice_file_path}'")
 
-    if not all([DiscoveredA2AClientClass, SendMessageRequest, MessageSendParams, Message, Part, Role, A2ACardResolverClass]):
+    if not _A2A_TYPES_AVAILABLE:
         return {
             "status": "error",
             "error_message": "A2A client components (Client, Resolver, Types) not initialized. Check imports."
         }
 
-    http_client = await _get_shared_httpx_client()
+    http_client = _get_shared_httpx_client()
     final_report: Dict[str, Any] = {"steps_taken": [], "overall_status": "pending"}
     po_extraction_full_obj: Optional[Dict[str, Any]] = None
     invoice_extraction_full_obj: Optional[Dict[str, Any]] = None
+    prefetched_invoice_response: Optional[Dict[str, Any]] = None
 
     po_number_to_process = po_number_input.strip().upper() if po_number_input else None
     if not po_number_to_process:
@@ -169,7 +293,7 @@ async def _orchestrate_po_reconciliation_tool(
 
     step_msg_po = f"Step 1: Acquiring PO '{po_number_to_process}'."
     final_report["steps_taken"].append(step_msg_po); print(f"ORCHESTRATOR: {step_msg_po}")
-    po_from_db = get_po_by_number(po_number_to_process)
+    po_from_db = await _db_call(get_po_by_number, po_number_to_process)
     ingestion_response_dict = {}
 
     if po_from_db:
@@ -185,39 +309,26 @@ async def _orchestrate_po_reconciliation_tool(
         )
         if not ingestion_agent_client:
             ingestion_response_dict = {"status": "error", "error_message": "Failed to resolve or initialize client for Data Ingestion Agent (PO)."}
+        elif new_invoice_file_path:
+            # The invoice ingestion doesn't depend on the PO result, so when
+            # both new files are provided run the two delegations concurrently
+            # (one resolved client serves both) instead of paying two
+            # sequential round-trips. Ingestion is an INSERT OR REPLACE, so
+            # storing the invoice up front is harmless even if the PO leg
+            # fails.
+            invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
+            ingestion_response_dict, prefetched_invoice_response = await asyncio.gather(
+                _send_a2a_tool_request(ingestion_agent_client, ingestion_tool_text, "PO"),
+                _send_a2a_tool_request(ingestion_agent_client, invoice_tool_text, "Invoice")
+            )
         else:
-            try:
-                msg_parts_po = [Part(text=ingestion_tool_text)]
-                actual_msg_obj_po = Message(messageId=str(uuid.uuid4()), parts=msg_parts_po, role=Role.user)
-                msg_params_po = MessageSendParams(message=actual_msg_obj_po)
-                a2a_payload_po = SendMessageRequest(params=msg_params_po, id=str(uuid.uuid4()))
-                
-                print(f"ORCHESTRATOR: Sending A2A PO request via resolved client to {ingestion_agent_client.url if hasattr(ingestion_agent_client, 'url') else 'unknown URL'}")
-                ingestion_response_sdk_obj = await ingestion_agent_client.send_message(request=a2a_payload_po)
-                
-                if ingestion_response_sdk_obj and hasattr(ingestion_response_sdk_obj, 'message') and ingestion_response_sdk_obj.message and hasattr(ingestion_response_sdk_obj.message, 'parts') and ingestion_response_sdk_obj.message.parts:
-                    response_text = ingestion_response_sdk_obj.message.parts[0].text
-                    print(f"ORCHESTRATOR: Received A2A PO response: {response_text[:200]}...")
-                    ingestion_response_dict = json.loads(response_text)
-                elif ingestion_response_sdk_obj and hasattr(ingestion_response_sdk_obj, 'error') and ingestion_response_sdk_obj.error:
-                    ingestion_response_dict = {"status": "error", "error_message": f"A2A PO call failed - agent error: {ingestion_response_sdk_obj.error.details if hasattr(ingestion_response_sdk_obj.error, 'details') else ingestion_response_sdk_obj.error.message}"}
-                else:
-                    ingestion_response_dict = {"status": "error", "error_message": "A2A PO call failed - unexpected response structure"}
-            except pydantic.ValidationError as ve:
-                ingestion_response_dict = {"status": "error", "error_message": f"Pydantic validation error creating A2A PO request: {ve}"}
-                print(f"PYDANTIC ERROR (PO Ingestion): {ve}")
-            except json.JSONDecodeError as e:
-                ingestion_response_dict = {"status": "error", "error_message": f"Invalid JSON response from A2A (PO): {str(e)}"}
-            except Exception as e:
-                ingestion_response_dict = {"status": "error", "error_message": f"A2A PO communication error: {str(e)} \n{traceback.format_exc()}"}
-                print(traceback.format_exc())
-        
+            ingestion_response_dict = await _send_a2a_tool_request(ingestion_agent_client, ingestion_tool_text, "PO")
+
         final_report["po_acquisition"] = ingestion_response_dict
         if ingestion_response_dict.get("status") == "success":
             po_extraction_full_obj = ingestion_response_dict.get("full_extraction_result")
-            if po_extraction_full_obj and isinstance(po_extraction_full_obj, dict):
-                extracted_po_num_obj = po_extraction_full_obj.get("data",{}).get("document_number")
-                extracted_po_num = str(extracted_po_num_obj).strip().upper() if extracted_po_num_obj is not None else ""
+            if po_extraction_full_obj and type(po_extraction_full_obj) is dict:
+                extracted_po_num = _extract_document_number(po_extraction_full_obj)
                 if extracted_po_num and extracted_po_num != po_number_to_process:
                     step_msg_po += f" File extracted as PO '{extracted_po_num}'. Using this."
                     po_number_to_process = extracted_po_num
@@ -225,11 +336,11 @@ async def _orchestrate_po_reconciliation_tool(
             else:
                 ingestion_response_dict["status"] = "error"
                 ingestion_response_dict["error_message"] = "A2A PO ingestion succeeded but response format was unexpected."
-                final_report["overall_status"] = "error"; final_report["error_message"] = ingestion_response_dict["error_message"]
-                final_report["steps_taken"].append(step_msg_po + " - Error in response format"); print(f"ORCHESTRATOR: {step_msg_po} - Error in response format"); return final_report
+                return _finalize_error(final_report, ingestion_response_dict["error_message"],
+                                       step_msg_po + " - Error in response format")
         else:
-            final_report["overall_status"] = "error"; final_report["error_message"] = f"A2A PO ingestion failed: {ingestion_response_dict.get('error_message', 'Unknown error')}"
-            final_report["steps_taken"].append(step_msg_po); print(f"ORCHESTRATOR: {step_msg_po} - Error"); return final_report
+            return _finalize_error(final_report, f"A2A PO ingestion failed: {ingestion_response_dict.get('error_message', 'Unknown error')}",
+                                   step_msg_po, step_msg_po + " - Error")
     else:
         step_msg_po += f" PO '{po_number_to_process}' not found in DB and no new file provided."
         final_report["overall_status"] = "po_not_found_needs_file"; final_report["message_to_user"] = step_msg_po
@@ -242,9 +353,7 @@ async def _orchestrate_po_reconciliation_tool(
         final_report["overall_status"] = "error"; final_report["error_message"] = "Critical: PO data object is missing after acquisition attempts."
         return final_report
 
-    confirmed_po_number = ""
-    if isinstance(po_extraction_full_obj, dict) and "data" in po_extraction_full_obj:
-        confirmed_po_number = str(po_extraction_full_obj.get("data", {}).get("document_number", "")).strip().upper()
+    confirmed_po_number = _extract_document_number(po_extraction_full_obj)
     if not confirmed_po_number and po_number_to_process :
          confirmed_po_number = po_number_to_process
     if not confirmed_po_number:
@@ -258,58 +367,37 @@ async def _orchestrate_po_reconciliation_tool(
 
     if new_invoice_file_path:
         step_msg_inv += f" Delegating ingestion of new invoice file '{new_invoice_file_path}'."
-        invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
-        
-        ingestion_agent_client_for_invoice = await _resolve_and_get_a2a_client(
-            http_client, DATA_INGESTION_AGENT_BASE_URL, "DataIngestionAgent (for Invoice)"
-        )
-        if not ingestion_agent_client_for_invoice:
-            ingestion_response_dict_inv = {"status": "error", "error_message": "Failed to resolve or initialize client for Data Ingestion Agent (Invoice)."}
+        if prefetched_invoice_response is not None:
+            # Already ingested concurrently with the PO leg above.
+            ingestion_response_dict_inv = prefetched_invoice_response
         else:
-            try:
-                msg_parts_inv = [Part(text=invoice_tool_text)]
-                actual_msg_obj_inv = Message(messageId=str(uuid.uuid4()), parts=msg_parts_inv, role=Role.user)
-                msg_params_inv = MessageSendParams(message=actual_msg_obj_inv)
-                a2a_payload_inv = SendMessageRequest(params=msg_params_inv, id=str(uuid.uuid4()))
-                
-                print(f"ORCHESTRATOR: Sending A2A invoice request via resolved client to {ingestion_agent_client_for_invoice.url if hasattr(ingestion_agent_client_for_invoice, 'url') else 'unknown URL'}")
-                ingestion_response_inv_sdk_obj = await ingestion_agent_client_for_invoice.send_message(request=a2a_payload_inv)
-
-                if ingestion_response_inv_sdk_obj and hasattr(ingestion_response_inv_sdk_obj, 'message') and ingestion_response_inv_sdk_obj.message and hasattr(ingestion_response_inv_sdk_obj.message, 'parts') and ingestion_response_inv_sdk_obj.message.parts:
-                    response_text_inv = ingestion_response_inv_sdk_obj.message.parts[0].text
-                    print(f"ORCHESTRATOR: Received A2A invoice response: {response_text_inv[:200]}...")
-                    ingestion_response_dict_inv = json.loads(response_text_inv)
-                elif ingestion_response_inv_sdk_obj and hasattr(ingestion_response_inv_sdk_obj, 'error') and ingestion_response_inv_sdk_obj.error:
-                    ingestion_response_dict_inv = {"status": "error", "error_message": f"A2A Invoice call failed - agent error: {ingestion_response_inv_sdk_obj.error.details if hasattr(ingestion_response_inv_sdk_obj.error, 'details') else ingestion_response_inv_sdk_obj.error.message}"}
-                else:
-                    ingestion_response_dict_inv = {"status": "error", "error_message": "A2A Invoice call failed - unexpected response structure"}
-            except pydantic.ValidationError as ve:
-                ingestion_response_dict_inv = {"status": "error", "error_message": f"Pydantic validation error creating A2A Invoice request: {ve}"}
-                print(f"PYDANTIC ERROR (Invoice Ingestion): {ve}")
-            except json.JSONDecodeError as e:
-                ingestion_response_dict_inv = {"status": "error", "error_message": f"Invalid JSON response from A2A (Invoice): {str(e)}"}
-            except Exception as e:
-                ingestion_response_dict_inv = {"status": "error", "error_message": f"A2A Invoice communication error: {str(e)} \n{traceback.format_exc()}"}
-                print(traceback.format_exc())
+            invoice_tool_text = f"_ingest_and_store_document_tool: {json.dumps({'raw_document_file_path': new_invoice_file_path, 'document_type': 'invoice'})}"
+
+            ingestion_agent_client_for_invoice = await _resolve_and_get_a2a_client(
+                http_client, DATA_INGESTION_AGENT_BASE_URL, "DataIngestionAgent (for Invoice)"
+            )
+            if not ingestion_agent_client_for_invoice:
+                ingestion_response_dict_inv = {"status": "error", "error_message": "Failed to resolve or initialize client for Data Ingestion Agent (Invoice)."}
+            else:
+                ingestion_response_dict_inv = await _send_a2a_tool_request(ingestion_agent_client_for_invoice, invoice_tool_text, "Invoice")
 
         final_report["invoice_acquisition"] = ingestion_response_dict_inv
         if ingestion_response_dict_inv.get("status") == "success":
             invoice_extraction_full_obj = ingestion_response_dict_inv.get("full_extraction_result")
-            if not (invoice_extraction_full_obj and isinstance(invoice_extraction_full_obj, dict)):
+            if not (invoice_extraction_full_obj and type(invoice_extraction_full_obj) is dict):
                  ingestion_response_dict_inv["status"] = "error"
                  ingestion_response_dict_inv["error_message"] = "A2A Invoice ingestion succeeded but response format was unexpected."
-                 final_report["overall_status"] = "error"; final_report["error_message"] = ingestion_response_dict_inv["error_message"]
-                 final_report["steps_taken"].append(step_msg_inv + " - Error in response format"); print(f"ORCHESTRATOR: {step_msg_inv} - Error in response format"); return final_report
+                 return _finalize_error(final_report, ingestion_response_dict_inv["error_message"],
+                                        step_msg_inv + " - Error in response format")
             step_msg_inv += " Successfully ingested new invoice via A2A."
         else:
-            final_report["overall_status"] = "error"; final_report["error_message"] = f"A2A Invoice ingestion failed: {ingestion_response_dict_inv.get('error_message', 'Unknown error')}"
-            final_report["steps_taken"].append(step_msg_inv); print(f"ORCHESTRATOR: {step_msg_inv} - Error"); return final_report
+            return _finalize_error(final_report, f"A2A Invoice ingestion failed: {ingestion_response_dict_inv.get('error_message', 'Unknown error')}",
+                                   step_msg_inv, step_msg_inv + " - Error")
     else:
         step_msg_inv += f" Searching DB for invoice related to PO '{confirmed_po_number}'."
-        invoice_extraction_full_obj = get_invoice_by_related_po(confirmed_po_number)
+        invoice_extraction_full_obj = await _db_call(get_invoice_by_related_po, confirmed_po_number)
         if invoice_extraction_full_obj:
-            inv_num_found_obj = invoice_extraction_full_obj.get('data',{}).get('document_number', 'UNKNOWN')
-            inv_num_found = str(inv_num_found_obj)
+            inv_num_found = _extract_document_number(invoice_extraction_full_obj) or "UNKNOWN"
             step_msg_inv += f" Found related invoice '{inv_num_found}' in DB."
             final_report["invoice_acquisition"] = {"status": "success_from_db_related_to_po", "source": "database", "document_number": inv_num_found}
         else:
@@ -336,31 +424,7 @@ async def _orchestrate_po_reconciliation_tool(
     if not reco_agent_client:
         reco_response_dict = {"status": "error", "error_message": "Failed to resolve or initialize client for Reconciliation Agent."}
     else:
-        try:
-            msg_parts_reco = [Part(text=reco_tool_invocation_text)]
-            actual_msg_obj_reco = Message(messageId=str(uuid.uuid4()), parts=msg_parts_reco, role=Role.user)
-            msg_params_reco = MessageSendParams(message=actual_msg_obj_reco)
-            a2a_payload_reco = SendMessageRequest(params=msg_params_reco, id=str(uuid.uuid4()))
-            
-            print(f"ORCHESTRATOR: Sending A2A reconciliation request via resolved client to {reco_agent_client.url if hasattr(reco_agent_client, 'url') else 'unknown URL'}")
-            reco_response_sdk_obj = await reco_agent_client.send_message(request=a2a_payload_reco)
-
-            if reco_response_sdk_obj and hasattr(reco_response_sdk_obj, 'message') and reco_response_sdk_obj.message and hasattr(reco_response_sdk_obj.message, 'parts') and reco_response_sdk_obj.message.parts:
-                response_text_reco = reco_response_sdk_obj.message.parts[0].text
-                print(f"ORCHESTRATOR: Received A2A reconciliation response: {response_text_reco[:200]}...")
-                reco_response_dict = json.loads(response_text_reco)
-            elif reco_response_sdk_obj and hasattr(reco_response_sdk_obj, 'error') and reco_response_sdk_obj.error:
-                reco_response_dict = {"status": "error", "error_message": f"A2A Reconciliation call failed - agent error: {reco_response_sdk_obj.error.details if hasattr(reco_response_sdk_obj.error, 'details') else reco_response_sdk_obj.error.message}"}
-            else:
-                reco_response_dict = {"status": "error", "error_message": "A2A Reconciliation call failed - unexpected response structure"}
-        except pydantic.ValidationError as ve:
-            reco_response_dict = {"status": "error", "error_message": f"Pydantic validation error creating A2A Reconciliation request: {ve}"}
-            print(f"PYDANTIC ERROR (Reconciliation): {ve}")
-        except json.JSONDecodeError as e:
-            reco_response_dict = {"status": "error", "error_message": f"Invalid JSON response from A2A (Reconciliation): {str(e)}"}
-        except Exception as e:
-            reco_response_dict = {"status": "error", "error_message": f"A2A Reconciliation communication error: {str(e)} \n{traceback.format_exc()}"}
-            print(traceback.format_exc())
+        reco_response_dict = await _send_a2a_tool_request(reco_agent_client, reco_tool_invocation_text, "Reconciliation")
 
     final_report["reconciliation_report"] = reco_response_dict
     if reco_response_dict.get("status") == "success":
@@ -1,12 +1,25 @@
 
 import json
-import httpx 
+import httpx
+import logging
+import asyncio
 from typing import Dict, Any, Optional, List
-import traceback
+import threading
 import os # For environment variables for timeouts etc.
 
+logger = logging.getLogger(__name__)
+
+# How much raw SSE body to keep around for error snippets.
+_RAW_SNIPPET_LIMIT = 500
+
+# SSE event-line prefix, with its length computed once rather than re-running
+# len("data:") for every line of every stream.
+_SSE_DATA_PREFIX = "data:"
+_SSE_DATA_PREFIX_LEN = len(_SSE_DATA_PREFIX)
+
 
 class Part:
+    __slots__ = ("text", "inline_data")
     def __init__(self, text: Optional[str] = None, inline_data: Optional[Dict] = None):
         self.text = text; self.inline_data = inline_data
     def to_dict(self):
@@ -15,15 +28,18 @@ class Part:
         if self.inline_data: d["inline_data"] = self.inline_data
         return d
 class MessageSendParams:
+    __slots__ = ("parts",)
     def __init__(self, parts: List[Part]): self.parts = parts
     def to_dict(self): return {"parts": [p.to_dict() for p in self.parts]}
 
 class ADKChatMessage: # Structure that ADK /run_sse endpoint might expect for a chat turn
+    __slots__ = ("role", "parts")
     def __init__(self, role: str, parts: List[Part]):
         self.role = role; self.parts = parts
     def to_dict(self): return {"role": self.role, "parts": [p.to_dict() for p in self.parts]}
 
 class ADKRunRequestPayload: # Structure that ADK /run_sse endpoint might expect
+    __slots__ = ("app_name", "session_id", "user_id", "contents", "tools_config")
     def __init__(self, app_name:str, session_id:str, user_id:str, contents: List[ADKChatMessage], tools_config=None):
         self.app_name = app_name 
         self.session_id = session_id
@@ -38,6 +54,7 @@ class ADKRunRequestPayload: # Structure that ADK /run_sse endpoint might expect
         }
 
 class A2AResponse:
+    __slots__ = ("status", "data", "error_message")
     def __init__(self, status: str, data: Optional[Dict[str, Any]] = None, error_message: Optional[str] = None):
         self.status = status
         self.data = data 
@@ -47,16 +64,145 @@ class A2AResponse:
 
 
 
+def _build_run_request_payload(app_name: str, session_id: str, user_id: str, query_text: str) -> Dict[str, Any]:
+    """Builds the /run_sse request body for a single user query.
+
+    Equivalent to ADKRunRequestPayload(...).to_dict() but built as one dict
+    literal: the send path is the only caller and does not need the four
+    intermediate wrapper objects (payload, message, part) allocated per call.
+    The wrapper classes above remain for callers that build payloads
+    incrementally. Deliberately no template cache here -- session_id is part
+    of the body, so any cache keyed on it grows by one entry per session for
+    the life of the process while saving only a five-key dict build.
+    """
+    return {
+        "app_name": app_name, "session_id": session_id, "user_id": user_id,
+        "tools_config": None,
+        "contents": [{"role": "user", "parts": [{"text": query_text}]}],
+    }
+
+
+# Sentinel the pump task enqueues when the underlying stream is exhausted.
+_STREAM_END = object()
+
+
+async def _iter_lines_buffered(http_response, maxsize: int = 32):
+    """Yields the response's lines through a small bounded queue.
+
+    Iterating aiter_lines() directly couples the network read to the
+    consumer: no new bytes are requested while an event is being parsed.
+    A pump task reading into a queue lets the transport prefetch up to
+    maxsize lines ahead of the parser.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def _pump():
+        try:
+            async for line in http_response.aiter_lines():
+                await queue.put(line)
+        except asyncio.CancelledError:
+            # Cancelled by the consumer's early exit below: it has stopped
+            # draining, so putting the sentinel could block forever on a full
+            # queue, and nothing would read it anyway.
+            raise
+        except BaseException:
+            # Read error with the consumer still draining; a blocking put is
+            # fine here (and gets cancelled if the consumer bails meanwhile).
+            await queue.put(_STREAM_END)
+            raise
+        else:
+            await queue.put(_STREAM_END)
+
+    pump_task = asyncio.create_task(_pump())
+    try:
+        while True:
+            line = await queue.get()
+            if line is _STREAM_END:
+                break
+            yield line
+        # Re-raise any read error the pump hit before signalling the end.
+        await pump_task
+    finally:
+        # Early exits (the send loop breaks at the first functionResponse)
+        # must wait for the pump to actually finish, not just request it:
+        # a fire-and-forget cancel leaves the task to be torn down by the
+        # loop later ("Task was destroyed but it is pending!").
+        if not pump_task.done():
+            pump_task.cancel()
+            try:
+                await pump_task
+            except asyncio.CancelledError:
+                pass
+
+
+def _extract_event_payloads(event_json: Dict[str, Any]):
+    """Pulls the interesting payloads out of one decoded SSE event.
+
+    Returns (tool_output, text_parts): the first functionResponse payload
+    found (or None) and any plain-text parts. Keeping the part-shape probing
+    in one place means the send loop below does a single call per event
+    instead of re-spelling the key checks inline.
+    """
+    tool_output = None
+    text_parts = []
+    content = event_json.get("content")
+    parts = content.get("parts") if content else None
+    if parts:
+        for part in parts:
+            # One .get per candidate key instead of a membership test followed
+            # by a second lookup for the same key.
+            function_response = part.get("functionResponse")
+            if function_response is not None:
+                response = function_response.get("response")
+                if response is not None:
+                    tool_output = response
+                    break
+            text = part.get("text")
+            if text is not None:
+                text_parts.append(text)
+    return tool_output, text_parts
+
+
 class A2AClient:
     def __init__(self):
-        self.agent_urls: Dict[str, str] = {} 
-        self.http_client = httpx.AsyncClient(timeout=float(os.getenv("A2A_TIMEOUT", "60.0"))) # Timeout for A2A calls
-        print("A2AClient initialized (using real httpx.AsyncClient).")
+        self.agent_urls: Dict[str, str] = {}
+        # Full /run_sse endpoint per agent, derived once at registration so the
+        # send path doesn't re-assemble the same URL on every message.
+        self.agent_endpoints: Dict[str, str] = {}
+        self._registry_lock = threading.Lock() # Registrations may come from server threads
+        # Created lazily: the module-level singleton below is constructed at
+        # import time, before any event loop exists and in processes that may
+        # never send a message, so don't pay for socket machinery up front.
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # Admission control for concurrent sends. A Condition plus explicit
+        # counter instead of a Semaphore so the limit can be retuned at
+        # runtime via set_max_concurrent; resizing a Semaphore's internal
+        # value is undefined behavior.
+        self._max_concurrent = int(os.getenv("A2A_MAX_CONCURRENT", "8"))
+        self._active_sends = 0
+        self._send_slot = asyncio.Condition()
+        logger.info("A2AClient initialized (httpx.AsyncClient created on first use).")
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            # Explicit keep-alive limits: sub-agent endpoints are a small fixed
+            # set, so held-open connections skip the TCP handshake on repeat
+            # sends without letting the pool grow unbounded.
+            self._http_client = httpx.AsyncClient(
+                timeout=float(os.getenv("A2A_TIMEOUT", "60.0")), # Timeout for A2A calls
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+            logger.info("A2AClient: Created httpx.AsyncClient.")
+        return self._http_client
 
     def register_agent_url(self, agent_name: str, base_url: str):
-        
-        self.agent_urls[agent_name] = base_url.rstrip('/')
-        print(f"A2AClient: Registered agent '{agent_name}' at base URL '{base_url}'")
+
+        base = base_url.rstrip('/')
+        with self._registry_lock:
+            self.agent_urls[agent_name] = base
+            self.agent_endpoints[agent_name] = f"{base}/run_sse" # Common ADK endpoint for LlmAgent interaction
+        logger.info("A2AClient: Registered agent '%s' at base URL '%s'", agent_name, base_url)
 
     async def send_message_to_sub_agent(
         self, 
@@ -71,69 +217,77 @@ class A2AClient:
         Sends a message (query) to a target sub-agent's ADK endpoint and
         attempts to get a structured JSON response from its tool execution.
         """
-        base_url = self.agent_urls.get(target_agent_name)
-        if not base_url:
+        with self._registry_lock:
+            adk_endpoint_url = self.agent_endpoints.get(target_agent_name)
+        if not adk_endpoint_url:
             return A2AResponse(status="error", error_message=f"Target agent '{target_agent_name}' URL not registered.")
 
-
-        adk_endpoint_url = f"{base_url}/run_sse" # Common ADK endpoint for LlmAgent interaction
-
-        print(f"A2A_CLIENT: Sending A2A message to '{target_agent_name}' at '{adk_endpoint_url}' with query: '{query_for_sub_agent_llm}'")
+        logger.info("A2A_CLIENT: Sending A2A message to '%s' at '%s' with query: '%s'",
+                    target_agent_name, adk_endpoint_url, query_for_sub_agent_llm)
 
         
-        request_payload = ADKRunRequestPayload(
-            app_name=sub_agent_adk_app_name, 
-            session_id=session_id,
-            user_id=user_id,
-            contents=[ADKChatMessage(role="user", parts=[Part(text=query_for_sub_agent_llm)])]
-        ).to_dict()
+        request_payload = _build_run_request_payload(
+            sub_agent_adk_app_name, session_id, user_id, query_for_sub_agent_llm
+        )
 
+        async with self._send_slot:
+            await self._send_slot.wait_for(self._send_slot_free)
+            self._active_sends += 1
         try:
-            http_response = await self.http_client.post(adk_endpoint_url, json=request_payload)
-            
-            response_text = http_response.text
-            
+            # Consume the SSE body as it streams in instead of buffering the
+            # whole response first: events are parsed as they arrive, and once
+            # the first functionResponse shows up we stop reading (closing the
+            # stream) rather than waiting for the sub-agent to finish talking.
             tool_output_dict = None
-            for line in response_text.splitlines():
-                if line.startswith("data:"):
-                    try:
-                        event_data_str = line[len("data:"):].strip()
-                        event_json = json.loads(event_data_str)
-                        
-                        if "content" in event_json and "parts" in event_json["content"]:
-                            for part in event_json["content"]["parts"]:
-                                if "functionResponse" in part and "response" in part["functionResponse"]:
-                                    tool_output_dict = part["functionResponse"]["response"]
-                                    print(f"A2A_CLIENT: Extracted tool_output_dict from {target_agent_name}: {tool_output_dict}")
-                                    break 
+            final_text_parts = []
+            # Raw lines are only ever surfaced as a 500-char error snippet, so
+            # cap how much of the body we retain instead of accumulating every
+            # line of a long (possibly never-matching) stream in memory.
+            raw_lines = []
+            raw_chars = 0
+            line_count = 0
+            async with self.http_client.stream("POST", adk_endpoint_url, json=request_payload) as http_response:
+                status_code = http_response.status_code
+                async for line in _iter_lines_buffered(http_response):
+                    line_count += 1
+                    if raw_chars < _RAW_SNIPPET_LIMIT:
+                        raw_lines.append(line)
+                        raw_chars += len(line) + 1
+                    # aiter_lines only awaits on network reads; one large read
+                    # can buffer many lines that are then handed out without a
+                    # suspension point, so yield to the loop now and then.
+                    if line_count % 64 == 0:
+                        await asyncio.sleep(0)
+                    if line.startswith(_SSE_DATA_PREFIX):
+                        try:
+                            event_data_str = line[_SSE_DATA_PREFIX_LEN:].strip()
+                            event_json = json.loads(event_data_str)
+
+                            tool_output_dict, text_parts = _extract_event_payloads(event_json)
+                            final_text_parts.extend(text_parts)
                             if tool_output_dict:
-                                break 
-                    except json.JSONDecodeError:
-                        
-                        continue
-                    except Exception as e_parse:
-                        print(f"A2A_CLIENT: Error parsing SSE event from {target_agent_name}: {e_parse} on line: {line}")
+                                logger.debug("A2A_CLIENT: Extracted tool_output_dict from %s: %s", target_agent_name, tool_output_dict)
+                                break
+                        except json.JSONDecodeError:
+
+                            continue
+                        except Exception as e_parse:
+                            logger.warning("A2A_CLIENT: Error parsing SSE event from %s: %s on line: %s", target_agent_name, e_parse, line)
 
 
             if tool_output_dict:
-                
+
                 return A2AResponse(status="success", data=tool_output_dict)
             else:
-                
-                final_text = ""
-                for line in response_text.splitlines():
-                     if line.startswith("data:"):
-                        event_data_str = line[len("data:"):].strip()
-                        event_json = json.loads(event_data_str)
-                        if "content" in event_json and "parts" in event_json["content"]:
-                            for part in event_json["content"]["parts"]:
-                                if "text" in part: final_text += part["text"]
-                
-                error_msg_from_subagent = f"Sub-agent '{target_agent_name}' did not return a clear tool response. Final text: '{final_text}'. Full HTTP status: {http_response.status_code}"
-                print(f"A2A_CLIENT: {error_msg_from_subagent}")
-                
-                if http_response.status_code >= 400:
-                     error_msg_from_subagent = f"Sub-agent '{target_agent_name}' HTTP error {http_response.status_code}. Response: {response_text[:500]}"
+
+                final_text = "".join(final_text_parts)
+
+                error_msg_from_subagent = f"Sub-agent '{target_agent_name}' did not return a clear tool response. Final text: '{final_text}'. Full HTTP status: {status_code}"
+                logger.warning("A2A_CLIENT: %s", error_msg_from_subagent)
+
+                if status_code >= 400:
+                     response_text = "\n".join(raw_lines)
+                     error_msg_from_subagent = f"Sub-agent '{target_agent_name}' HTTP error {status_code}. Response: {response_text[:_RAW_SNIPPET_LIMIT]}"
 
                 return A2AResponse(status="error", error_message=error_msg_from_subagent)
 
@@ -142,9 +296,55 @@ class A2AClient:
         except httpx.RequestError as exc:
             return A2AResponse(status="error", error_message=f"A2A HTTP request to '{target_agent_name}' failed: {exc}")
         except Exception as e:
-            print(f"A2A_CLIENT: Unexpected error during send_message to '{target_agent_name}': {e}")
-            traceback.print_exc()
+            # Deferred %s formatting, and only walk/format the traceback when
+            # DEBUG is on: on a high-volume failure path (e.g. a misconfigured
+            # sub-agent) the full stack rendering dominates the handler cost.
+            logger.error("A2A_CLIENT: Unexpected error during send_message to '%s': %s", target_agent_name, e,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
             return A2AResponse(status="error", error_message=f"Unexpected error calling '{target_agent_name}': {str(e)}")
+        finally:
+            async with self._send_slot:
+                self._active_sends -= 1
+                self._send_slot.notify(1)
+
+    def _send_slot_free(self) -> bool:
+        return self._active_sends < self._max_concurrent
+
+    async def set_max_concurrent(self, n: int):
+        """Retunes the concurrent-send limit; waiters re-check immediately.
+
+        Raising the limit wakes every queued send so the newly opened slots
+        fill at once; lowering it lets in-flight sends finish and simply
+        admits fewer new ones.
+        """
+        async with self._send_slot:
+            self._max_concurrent = max(1, int(n))
+            self._send_slot.notify_all()
+
+    async def send_messages_to_sub_agents(self, message_specs: List[Dict[str, Any]]) -> List[A2AResponse]:
+        """Sends several independent sub-agent messages concurrently.
+
+        Each spec is a kwargs dict for send_message_to_sub_agent. Awaiting the
+        sends one after another pays N network latencies; gathering them costs
+        roughly one. Results come back in the order of the specs.
+        """
+        if not message_specs:
+            return []
+        return await asyncio.gather(
+            *(self.send_message_to_sub_agent(**spec) for spec in message_specs)
+        )
+
+    async def aclose(self):
+        """Closes the underlying httpx client from an async context.
+
+        Async callers can release the connection pool directly instead of
+        leaving it to garbage collection at interpreter shutdown; the lazy
+        http_client property will recreate the client if it is used again.
+        """
+        if self._http_client is not None and not self._http_client.is_closed:
+            logger.info("A2AClient: Closing httpx.AsyncClient.")
+            await self._http_client.aclose()
+        self._http_client = None
 
 
 a2a_client = A2AClient()
\ No newline at end of file
@@ -1,23 +1,81 @@
 import sqlite3
+import functools
 import json
 import os
+import sys
+import threading
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import re # For cleaning date strings
 
+# Every stored document round-trips through JSON; orjson encodes/decodes the
+# full_extracted_data_json blobs several times faster than the stdlib, so use
+# it when installed and fall back to json otherwise.
+try:
+    import orjson
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 DB_FILE_NAME = "reconciliation_data.db"
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, DB_FILE_NAME)
 
+# Schema setup is deferred until the first connection is actually requested:
+# every agent process imports this module, but several (e.g. the bare
+# orchestrator) may never touch the database, and the import-time CREATE
+# TABLE pass made them all pay for it at startup. The flag is only set once
+# the DDL has committed: the agents fire first-use queries from multi-thread
+# executors, and a flag set early would let a second thread read mid-DDL and
+# turn "no such table" into a silent wrong answer (the query helpers swallow
+# sqlite errors into not-found results). A failed init stays False and is
+# retried on the next call. initialize_database opens its connection with a
+# plain sqlite3.connect rather than get_db_connection so it doesn't recurse
+# back into this check while the lock is held.
+_init_lock = threading.Lock()
+_initialized = False
+
+def _ensure_initialized():
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        initialize_database()
+        _initialized = True
+
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
+    _ensure_initialized()
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
+# One long-lived connection per thread. Opening and tearing down a sqlite3
+# connection for every call repeats file-open/page-cache setup on paths that
+# run once per agent query; no caller holds a transaction open across calls
+# (reads are autocommit, writes commit or roll back before returning), so a
+# cached per-thread connection is safe to reuse indefinitely for both.
+_thread_local = threading.local()
+
+def _get_thread_connection():
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None:
+        _ensure_initialized()
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        _thread_local.conn = conn
+    return conn
+
 def initialize_database():
     """Creates the necessary tables if they don't already exist."""
-    conn = get_db_connection()
+    # Deliberately not get_db_connection(): that would re-enter
+    # _ensure_initialized under the init lock. DDL doesn't need row_factory.
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -67,126 +125,241 @@ def initialize_database():
     conn.close()
     print(f"DB_MGR: Database '{DB_PATH}' initialized/checked successfully.")
 
-# Call initialize_database when the module is loaded
-initialize_database()
 
 # --- DATE PARSING HELPER ---
+
+# Formats to try, in rough order of how often they appear in parsed documents.
+# A module-level tuple: the old per-call list literal was rebuilt on every parse
+# and carried duplicate entries ("%b %d %Y" / "%B %d %Y" appeared twice).
+_DATE_FORMATS = (
+    "%d %B %Y",  # e.g., "26 May 2025" / "26 may 2025"
+    "%d %b %Y",  # e.g., "26 May 2025" (some locales might use abbreviated month) / "26 may 2025"
+    "%B %d %Y",  # e.g., "May 26 2025" / "may 26 2025"
+    "%b %d %Y",  # e.g., "May 26 2025" / "may 26 2025"
+    "%Y-%m-%d",  # Already in desired format
+    "%m/%d/%Y",  # e.g., "05/26/2025"
+    "%d/%m/%Y",  # e.g., "26/05/2025"
+    "%Y/%m/%d",  # e.g., "2025/05/26"
+)
+
+# Documents from the same vendor/batch almost always share one date format, so
+# remember the format that last succeeded and try it before the full list.
+# Only the month-name formats are eligible: a string can satisfy at most one
+# of them (and "%B"/"%b" agree where both match), so trying the hint first can
+# never change the result. The numeric slash formats are excluded because
+# "05/04/2024" matches both "%m/%d/%Y" and "%d/%m/%Y" and a hint would make
+# the winner depend on whatever parsed previously instead of on _DATE_FORMATS
+# order. That also keeps the unsynchronized global benign: a stale or torn
+# read costs at most one wasted strptime probe, never a different date.
+_HINTABLE_FORMATS = frozenset((
+    "%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y",
+))
+_last_date_format_hint: Optional[str] = None
+
+# Compiled once; re.sub with a pattern string pays a cache lookup (and worst
+# case a recompile) on every date parsed.
+_ORDINAL_SUFFIX_RE = re.compile(r"(\d+)(st|nd|rd|th)")
+
 def parse_and_format_date(date_str: Optional[str]) -> Optional[str]:
-    if not date_str or not isinstance(date_str, str):
+    # json-decoded values are always concrete str/None, so an identity check
+    # is enough here and skips the isinstance machinery on this hot path
+    if not date_str or type(date_str) is not str:
         return None
+    return _parse_date_cached(date_str)
+
+# Batches re-parse the same handful of date strings (one shipment date across
+# a folder of documents); strptime probing is expensive enough that a small
+# memo on the exact input pays for itself after the second hit. Memoizing is
+# only sound because the function is deterministic: the format hint is limited
+# to _HINTABLE_FORMATS, which cannot change which date a string parses to, so
+# a cached result is the result every call would have produced.
+@functools.lru_cache(maxsize=512)
+def _parse_date_cached(date_str: str) -> Optional[str]:
+    global _last_date_format_hint
+
+    # The extraction prompt asks Gemini to normalize dates to YYYY-MM-DD, so
+    # most inputs already are. Vet those with the C-level fromisoformat and
+    # skip the cleaning regexes and strptime probing entirely.
+    if _ISO_DATE_RE.match(date_str):
+        try:
+            datetime.fromisoformat(date_str)
+            return date_str
+        except ValueError:
+            pass # e.g. "2025-02-31"; fall through to the full parser
 
     # Attempt to remove ordinal suffixes (st, nd, rd, th) and commas
     cleaned_date_str = date_str.lower()
-    cleaned_date_str = re.sub(r"(\d+)(st|nd|rd|th)", r"\1", cleaned_date_str)
+    cleaned_date_str = _ORDINAL_SUFFIX_RE.sub(r"\1", cleaned_date_str)
     cleaned_date_str = cleaned_date_str.replace(',', '') # Remove commas e.g. "May 26, 2025"
 
-    # Define a list of date formats to try
-    date_formats_to_try = [
-        "%d %B %Y",  # e.g., "26 May 2025" / "26 may 2025"
-        "%d %b %Y",  # e.g., "26 May 2025" (some locales might use abbreviated month) / "26 may 2025"
-        "%B %d %Y",  # e.g., "May 26 2025" / "may 26 2025"
-        "%b %d %Y",  # e.g., "May 26 2025" / "may 26 2025"
-        "%Y-%m-%d",  # Already in desired format
-        "%m/%d/%Y",  # e.g., "05/26/2025"
-        "%d/%m/%Y",  # e.g., "26/05/2025"
-        "%Y/%m/%d",  # e.g., "2025/05/26"
-        "%b %d %Y",  # e.g., "jan 01 2023"
-        "%B %d %Y",  # e.g., "january 01 2023"
-    ]
-
-    for fmt in date_formats_to_try:
+    cleaned_date_str = cleaned_date_str.strip()
+    if _last_date_format_hint:
+        try:
+            return datetime.strptime(cleaned_date_str, _last_date_format_hint).strftime("%Y-%m-%d")
+        except ValueError:
+            pass # Hint missed; fall through to the full list
+
+    for fmt in _DATE_FORMATS:
         try:
             # Further clean specific to format if needed, e.g. for %B Day Year
             # For "May 26 2025", no further cleaning needed if comma already removed.
-            dt_obj = datetime.strptime(cleaned_date_str.strip(), fmt)
+            dt_obj = datetime.strptime(cleaned_date_str, fmt)
+            if fmt in _HINTABLE_FORMATS:
+                _last_date_format_hint = fmt
             return dt_obj.strftime("%Y-%m-%d")
         except ValueError:
             continue # Try next format
-    
+
     print(f"DB_MGR: Warning - Could not parse date string '{date_str}' (cleaned: '{cleaned_date_str}') into YYYY-MM-DD. Storing as None.")
     return None # Return None if unparseable
 
+def _normalize_doc_number(value: Any) -> str:
+    """Normalizes a document number to its stripped upper-case key form.
+
+    Values are almost always already str (JSON-decoded), so skip the
+    redundant str() copy in that case.
+    """
+    s = value if type(value) is str else str(value)
+    return s.strip().upper()
+
 def store_invoice_data(invoice_number: str, extracted_invoice_data: Dict[str, Any]) -> bool:
     if not invoice_number or not str(invoice_number).strip():
         print("DB_MGR: Error - Invoice number is empty or None. Cannot store invoice.")
         return False
-    invoice_number_upper = str(invoice_number).strip().upper()
+    invoice_number_upper = _normalize_doc_number(invoice_number)
     data_to_insert = extracted_invoice_data.get("data", {})
-
     raw_invoice_date = data_to_insert.get("date")
-    formatted_invoice_date = parse_and_format_date(raw_invoice_date)
 
-    conn = get_db_connection()
+    # Same row shape as the batch path; one builder keeps the column order and
+    # normalization rules in a single place.
+    row = _invoice_row(invoice_number_upper, data_to_insert, extracted_invoice_data, datetime.now().isoformat())
+
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute('''
             INSERT OR REPLACE INTO invoices
             (invoice_number, vendor_name, invoice_date, total_amount, related_po_number, full_extracted_data_json, stored_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            invoice_number_upper,
-            data_to_insert.get("vendor_name"),
-            formatted_invoice_date, # Use the formatted date
-            data_to_insert.get("total_amount"),
-            str(data_to_insert.get("related_po_number","")).strip().upper() if data_to_insert.get("related_po_number") else None,
-            json.dumps(extracted_invoice_data),
-            datetime.now().isoformat()
-        ))
+        ''', row)
         conn.commit()
-        print(f"DB_MGR: Stored/Replaced Invoice '{invoice_number_upper}' with original date '{raw_invoice_date}' formatted as '{formatted_invoice_date}'.")
+        print(f"DB_MGR: Stored/Replaced Invoice '{invoice_number_upper}' with original date '{raw_invoice_date}' formatted as '{row[2]}'.")
         return True
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error storing invoice '{invoice_number_upper}': {e}")
+        conn.rollback() # Leave the shared connection transaction-free
         return False
-    finally:
-        conn.close()
 
 def store_po_data(po_number: str, extracted_po_data: Dict[str, Any]) -> bool:
     if not po_number or not str(po_number).strip():
         print("DB_MGR: Error - PO number is empty or None. Cannot store PO.")
         return False
-    po_number_upper = str(po_number).strip().upper()
+    po_number_upper = _normalize_doc_number(po_number)
     data_to_insert = extracted_po_data.get("data", {})
-
     raw_po_date = data_to_insert.get("date")
-    formatted_po_date = parse_and_format_date(raw_po_date)
 
-    conn = get_db_connection()
+    row = _po_row(po_number_upper, data_to_insert, extracted_po_data, datetime.now().isoformat())
+
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute('''
             INSERT OR REPLACE INTO purchase_orders
             (po_number, vendor_name, po_date, total_amount, full_extracted_data_json, stored_at)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            po_number_upper,
-            data_to_insert.get("vendor_name"),
-            formatted_po_date, # Use the formatted date
-            data_to_insert.get("total_amount"),
-            json.dumps(extracted_po_data),
-            datetime.now().isoformat()
-        ))
+        ''', row)
         conn.commit()
-        print(f"DB_MGR: Stored/Replaced PO '{po_number_upper}' with original date '{raw_po_date}' formatted as '{formatted_po_date}'.")
+        print(f"DB_MGR: Stored/Replaced PO '{po_number_upper}' with original date '{raw_po_date}' formatted as '{row[2]}'.")
         return True
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error storing PO '{po_number_upper}': {e}")
+        conn.rollback()
         return False
-    finally:
-        conn.close()
+
+def _invoice_row(doc_number_upper: str, data_to_insert: Dict[str, Any], extracted_data: Dict[str, Any], now_iso: str) -> tuple:
+    return (
+        doc_number_upper,
+        data_to_insert.get("vendor_name"),
+        parse_and_format_date(data_to_insert.get("date")),
+        data_to_insert.get("total_amount"),
+        _normalize_doc_number(data_to_insert.get("related_po_number", "")) if data_to_insert.get("related_po_number") else None,
+        _json_dumps(extracted_data),
+        now_iso
+    )
+
+def _po_row(doc_number_upper: str, data_to_insert: Dict[str, Any], extracted_data: Dict[str, Any], now_iso: str) -> tuple:
+    return (
+        doc_number_upper,
+        data_to_insert.get("vendor_name"),
+        parse_and_format_date(data_to_insert.get("date")),
+        data_to_insert.get("total_amount"),
+        _json_dumps(extracted_data),
+        now_iso
+    )
+
+def store_documents_batch(doc_type: str, documents: List[tuple]) -> int:
+    """Stores many (document_number, extracted_data) pairs in ONE transaction.
+
+    Ingesting N documents through store_invoice_data/store_po_data costs N
+    connections and N commits; this batches them into a single executemany,
+    which is the dominant saving when a folder of documents is ingested at
+    once. Returns the number of documents stored.
+    """
+    # Hash lookup against the shared table map instead of rebuilding a list
+    # literal and scanning it on every batch.
+    if doc_type not in _DOC_TYPE_TABLES:
+        raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
+
+    rows = []
+    now_iso = datetime.now().isoformat()
+    # Pick the row shape once; the old per-document if/else re-tested the same
+    # constant doc_type on every iteration.
+    row_builder = _invoice_row if doc_type == "invoice" else _po_row
+    for doc_number, extracted_data in documents:
+        if not doc_number or not str(doc_number).strip():
+            print(f"DB_MGR: Skipping batch entry with empty {doc_type} number.")
+            continue
+        doc_number_upper = _normalize_doc_number(doc_number)
+        data_to_insert = extracted_data.get("data", {})
+        rows.append(row_builder(doc_number_upper, data_to_insert, extracted_data, now_iso))
+    if not rows:
+        return 0
+
+    conn = _get_thread_connection()
+    cursor = conn.cursor()
+    try:
+        if doc_type == "invoice":
+            cursor.executemany('''
+                INSERT OR REPLACE INTO invoices
+                (invoice_number, vendor_name, invoice_date, total_amount, related_po_number, full_extracted_data_json, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        else:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO purchase_orders
+                (po_number, vendor_name, po_date, total_amount, full_extracted_data_json, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        conn.commit()
+        print(f"DB_MGR: Stored/Replaced {len(rows)} {doc_type}(s) in one batch.")
+        return len(rows)
+    except sqlite3.Error as e:
+        print(f"DB_MGR: SQLite error batch-storing {doc_type}s: {e}")
+        conn.rollback()
+        return 0
 
 # --- Existing GET functions (get_invoice_by_number, get_po_by_number, etc.) remain the same ---
 def get_invoice_by_number(invoice_number: str) -> Optional[Dict[str, Any]]:
     if not invoice_number or not str(invoice_number).strip(): return None
-    inv_num_upper = str(invoice_number).strip().upper()
-    conn = get_db_connection()
+    inv_num_upper = _normalize_doc_number(invoice_number)
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT full_extracted_data_json FROM invoices WHERE invoice_number = ?", (inv_num_upper,))
         row = cursor.fetchone()
         if row and row["full_extracted_data_json"]:
             print(f"DB_MGR: Found Invoice '{inv_num_upper}'.")
-            return json.loads(row["full_extracted_data_json"])
+            return _json_loads(row["full_extracted_data_json"])
         else:
             print(f"DB_MGR: Invoice '{inv_num_upper}' not found.")
             return None
@@ -194,21 +367,19 @@ def get_invoice_by_number(invoice_number: str) -> Optional[Dict[str, Any]]:
         print(f"DB_MGR: SQLite error fetching invoice '{inv_num_upper}': {e}")
     except json.JSONDecodeError as je:
         print(f"DB_MGR: Error decoding JSON for invoice '{inv_num_upper}': {je}")
-    finally:
-        conn.close()
     return None
 
 def get_po_by_number(po_number: str) -> Optional[Dict[str, Any]]:
     if not po_number or not str(po_number).strip(): return None
-    po_num_upper = str(po_number).strip().upper()
-    conn = get_db_connection()
+    po_num_upper = _normalize_doc_number(po_number)
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT full_extracted_data_json FROM purchase_orders WHERE po_number = ?", (po_num_upper,))
         row = cursor.fetchone()
         if row and row["full_extracted_data_json"]:
             print(f"DB_MGR: Found PO '{po_num_upper}'.")
-            return json.loads(row["full_extracted_data_json"])
+            return _json_loads(row["full_extracted_data_json"])
         else:
             print(f"DB_MGR: PO '{po_num_upper}' not found.")
             return None
@@ -216,23 +387,21 @@ def get_po_by_number(po_number: str) -> Optional[Dict[str, Any]]:
         print(f"DB_MGR: SQLite error fetching PO '{po_num_upper}': {e}")
     except json.JSONDecodeError as je:
         print(f"DB_MGR: Error decoding JSON for PO '{po_num_upper}': {je}")
-    finally:
-        conn.close()
     return None
 
 def get_invoice_by_related_po(po_number: str) -> Optional[Dict[str, Any]]:
     if not po_number or not str(po_number).strip():
         print("DB_MGR: Cannot search for invoice by empty related PO number.")
         return None
-    related_po_num_upper = str(po_number).strip().upper()
-    conn = get_db_connection()
+    related_po_num_upper = _normalize_doc_number(po_number)
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT full_extracted_data_json FROM invoices WHERE related_po_number = ?",
                        (related_po_num_upper,))
         row = cursor.fetchone()
         if row and row["full_extracted_data_json"]:
-            invoice_data = json.loads(row["full_extracted_data_json"])
+            invoice_data = _json_loads(row["full_extracted_data_json"])
             invoice_num_found = invoice_data.get("data",{}).get("document_number", "UNKNOWN")
             print(f"DB_MGR: Found Invoice '{invoice_num_found}' related to PO '{related_po_num_upper}'.")
             return invoice_data
@@ -243,46 +412,46 @@ def get_invoice_by_related_po(po_number: str) -> Optional[Dict[str, Any]]:
         print(f"DB_MGR: SQLite error fetching invoice by related PO '{related_po_num_upper}': {e}")
     except json.JSONDecodeError as je:
         print(f"DB_MGR: Error decoding JSON for invoice related to PO '{related_po_num_upper}': {je}")
-    finally:
-        conn.close()
     return None
 
 def get_all_invoices() -> List[Dict[str, Any]]:
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     results = []
     try:
         cursor.execute("SELECT full_extracted_data_json FROM invoices")
         rows = cursor.fetchall()
+        # Bind the loop's lookups to locals once; over a large table the
+        # repeated global/method resolution is measurable.
+        loads = _json_loads
+        append = results.append
         for row in rows:
             if row["full_extracted_data_json"]:
-                results.append(json.loads(row["full_extracted_data_json"]))
+                append(loads(row["full_extracted_data_json"]))
         return results
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error fetching all invoices: {e}")
         return []
-    finally:
-        conn.close()
 
 def get_all_purchase_orders() -> List[Dict[str, Any]]:
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     results = []
     try:
         cursor.execute("SELECT full_extracted_data_json FROM purchase_orders")
         rows = cursor.fetchall()
+        loads = _json_loads
+        append = results.append
         for row in rows:
             if row["full_extracted_data_json"]:
-                results.append(json.loads(row["full_extracted_data_json"]))
+                append(loads(row["full_extracted_data_json"]))
         return results
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error fetching all POs: {e}")
         return []
-    finally:
-        conn.close()
 
 def clear_database():
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM invoices")
@@ -291,105 +460,133 @@ def clear_database():
         print("DB_MGR: Database tables (invoices, purchase_orders) cleared.")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error clearing database: {e}")
-    finally:
-        conn.close()
+        conn.rollback()
 
 # --- NEW FUNCTIONS FOR DATABASE QUERY AGENT (These were already correct) ---
 
+# Table/date-column names per doc_type, resolved once at import so the query
+# functions don't re-derive them (and re-format SQL text) on every call.
+_DOC_TYPE_TABLES = {
+    "invoice": ("invoices", "invoice_date"),
+    "purchase_order": ("purchase_orders", "po_date"),
+}
+_COUNT_BY_DATE_SQL = {
+    doc_type: f"SELECT COUNT(*) FROM {table} WHERE {col} >= ? AND {col} <= ?"
+    for doc_type, (table, col) in _DOC_TYPE_TABLES.items()
+}
+_COUNT_BY_VENDOR_SQL = {
+    doc_type: f"SELECT COUNT(*) FROM {table} WHERE vendor_name LIKE ?"
+    for doc_type, (table, _) in _DOC_TYPE_TABLES.items()
+}
+_SUM_BY_VENDOR_SQL = {
+    doc_type: f"SELECT SUM(total_amount) FROM {table} WHERE vendor_name LIKE ?"
+    for doc_type, (table, _) in _DOC_TYPE_TABLES.items()
+}
+_SELECT_BY_VENDOR_SQL = {
+    doc_type: f"SELECT full_extracted_data_json FROM {table} WHERE vendor_name LIKE ? LIMIT ?"
+    for doc_type, (table, _) in _DOC_TYPE_TABLES.items()
+}
+_SELECT_BY_DATE_SQL = {
+    doc_type: f"SELECT full_extracted_data_json FROM {table} WHERE {col} >= ? AND {col} <= ? LIMIT ?"
+    for doc_type, (table, col) in _DOC_TYPE_TABLES.items()
+}
+
+# Query inputs are already normalized to YYYY-MM-DD, so a precompiled regex
+# match is enough to vet them; the previous per-call strptime pair paid for
+# full datetime construction (and exception unwinding on bad input) just to
+# throw the result away.
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
+def _is_valid_iso_date_range(start_date_str: str, end_date_str: str) -> bool:
+    return bool(_ISO_DATE_RE.match(start_date_str or "") and _ISO_DATE_RE.match(end_date_str or ""))
+
 def get_documents_count_by_date_range(doc_type: str, start_date_str: str, end_date_str: str) -> int:
     """Gets the count of documents (invoices or purchase_orders) within a specified date range."""
-    if doc_type not in ["invoice", "purchase_order"]:
+    # One .get serves as both the validity check and the statement lookup.
+    sql = _COUNT_BY_DATE_SQL.get(doc_type)
+    if sql is None:
         raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
-    
-    table_name = "invoices" if doc_type == "invoice" else "purchase_orders"
-    date_column = "invoice_date" if doc_type == "invoice" else "po_date"
-    
-    try:
-        datetime.strptime(start_date_str, "%Y-%m-%d")
-        datetime.strptime(end_date_str, "%Y-%m-%d")
-    except ValueError:
+
+    if not _is_valid_iso_date_range(start_date_str, end_date_str):
         print(f"DB_MGR: Invalid date format for {start_date_str} or {end_date_str} for count. Expected YYYY-MM-DD.")
         return 0
 
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     count = 0
     try:
         # Dates are stored as YYYY-MM-DD, so direct string comparison works
-        query = f"SELECT COUNT(*) FROM {table_name} WHERE {date_column} >= ? AND {date_column} <= ?"
-        cursor.execute(query, (start_date_str, end_date_str))
+        cursor.execute(sql, (start_date_str, end_date_str))
         result = cursor.fetchone()
         if result:
             count = result[0]
         print(f"DB_MGR: Counted {count} {doc_type}(s) between {start_date_str} and {end_date_str}.")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error counting {doc_type} by date range: {e}")
-    finally:
-        conn.close()
     return count
 
 def get_documents_count_by_vendor(doc_type: str, vendor_name: str) -> int:
-    if doc_type not in ["invoice", "purchase_order"]:
+    sql = _COUNT_BY_VENDOR_SQL.get(doc_type)
+    if sql is None:
         raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
-    table_name = "invoices" if doc_type == "invoice" else "purchase_orders"
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     count = 0
     try:
-        query = f"SELECT COUNT(*) FROM {table_name} WHERE vendor_name LIKE ?"
-        cursor.execute(query, (f"%{vendor_name}%",))
+        cursor.execute(sql, (f"%{vendor_name}%",))
         result = cursor.fetchone()
         if result:
             count = result[0]
         print(f"DB_MGR: Counted {count} {doc_type}(s) for vendor like '{vendor_name}'.")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error counting {doc_type} by vendor: {e}")
-    finally:
-        conn.close()
     return count
 
 def get_total_amount_by_vendor(doc_type: str, vendor_name: str) -> float:
-    if doc_type not in ["invoice", "purchase_order"]:
+    sql = _SUM_BY_VENDOR_SQL.get(doc_type)
+    if sql is None:
         raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
-    table_name = "invoices" if doc_type == "invoice" else "purchase_orders"
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     total_amount = 0.0
     try:
-        query = f"SELECT SUM(total_amount) FROM {table_name} WHERE vendor_name LIKE ?"
-        cursor.execute(query, (f"%{vendor_name}%",))
+        cursor.execute(sql, (f"%{vendor_name}%",))
         result = cursor.fetchone()
         if result and result[0] is not None:
             total_amount = float(result[0])
         print(f"DB_MGR: Total amount for {doc_type}(s) from vendor like '{vendor_name}' is {total_amount:.2f}.")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error summing {doc_type} amounts by vendor: {e}")
-    except TypeError:
-        print(f"DB_MGR: No amounts found to sum for {doc_type}(s) from vendor like '{vendor_name}'.")
-    finally:
-        conn.close()
     return total_amount
 
 def _extract_data_field_from_json_row(row: sqlite3.Row) -> Optional[Dict[str, Any]]:
     if row and row["full_extracted_data_json"]:
         try:
-            full_data = json.loads(row["full_extracted_data_json"])
-            return full_data.get("data", {})
+            full_data = _json_loads(row["full_extracted_data_json"])
+            data_field = full_data.get("data", {})
+            # Vendor-filtered listings decode the same vendor string once per
+            # row; intern it so the N result dicts share one str object and
+            # downstream comparisons are pointer-fast.
+            vendor = data_field.get("vendor_name") if data_field else None
+            if type(vendor) is str:
+                data_field["vendor_name"] = sys.intern(vendor)
+            return data_field
         except json.JSONDecodeError:
             print(f"DB_MGR: Warning - Could not decode JSON from row to extract 'data' field.")
-            return {}
-    return {}
+            return None
+    # Misses return None rather than allocating a fresh empty dict per row;
+    # both callers only truth-test the result before appending.
+    return None
 
 def get_documents_by_vendor(doc_type: str, vendor_name: str, limit: int = 5) -> List[Dict[str, Any]]:
-    if doc_type not in ["invoice", "purchase_order"]:
+    sql = _SELECT_BY_VENDOR_SQL.get(doc_type)
+    if sql is None:
         raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
-    table_name = "invoices" if doc_type == "invoice" else "purchase_orders"
     results = []
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
-        query = f"SELECT full_extracted_data_json FROM {table_name} WHERE vendor_name LIKE ? LIMIT ?"
-        cursor.execute(query, (f"%{vendor_name}%", limit))
+        cursor.execute(sql, (f"%{vendor_name}%", limit))
         rows = cursor.fetchall()
         for row in rows:
             data_field = _extract_data_field_from_json_row(row)
@@ -398,27 +595,20 @@ def get_documents_by_vendor(doc_type: str, vendor_name: str, limit: int = 5) ->
         print(f"DB_MGR: Fetched {len(results)} {doc_type}(s) for vendor like '{vendor_name}' (limit {limit}).")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error fetching {doc_type} by vendor: {e}")
-    finally:
-        conn.close()
     return results
 
 def get_documents_by_date_range(doc_type: str, start_date_str: str, end_date_str: str, limit: int = 5) -> List[Dict[str, Any]]:
-    if doc_type not in ["invoice", "purchase_order"]:
+    sql = _SELECT_BY_DATE_SQL.get(doc_type)
+    if sql is None:
         raise ValueError("Invalid doc_type. Must be 'invoice' or 'purchase_order'.")
-    table_name = "invoices" if doc_type == "invoice" else "purchase_orders"
-    date_column = "invoice_date" if doc_type == "invoice" else "po_date"
-    try:
-        datetime.strptime(start_date_str, "%Y-%m-%d")
-        datetime.strptime(end_date_str, "%Y-%m-%d")
-    except ValueError:
+    if not _is_valid_iso_date_range(start_date_str, end_date_str):
         print(f"DB_MGR: Invalid date format for {start_date_str} or {end_date_str} for list. Expected YYYY-MM-DD.")
         return []
     results = []
-    conn = get_db_connection()
+    conn = _get_thread_connection()
     cursor = conn.cursor()
     try:
-        query = f"SELECT full_extracted_data_json FROM {table_name} WHERE {date_column} >= ? AND {date_column} <= ? LIMIT ?"
-        cursor.execute(query, (start_date_str, end_date_str, limit))
+        cursor.execute(sql, (start_date_str, end_date_str, limit))
         rows = cursor.fetchall()
         for row in rows:
             data_field = _extract_data_field_from_json_row(row)
@@ -427,7 +617,5 @@ def get_documents_by_date_range(doc_type: str, start_date_str: str, end_date_str
         print(f"DB_MGR: Fetched {len(results)} {doc_type}(s) from {start_date_str} to {end_date_str} (limit {limit}).")
     except sqlite3.Error as e:
         print(f"DB_MGR: SQLite error fetching {doc_type} by date range: {e}")
-    finally:
-        conn.close()
     return results
 
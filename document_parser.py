@@ -1,35 +1,43 @@
 import os
 import json
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any
 import google.generativeai as genai
-from PIL import Image
-import io
-import re
 import traceback
 
 
 API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Sentinel for "key absent" probes where None is a legitimate value.
+_MISSING = object()
 MODEL_NAME_FROM_ENV = os.getenv("MODEL_NAME", "gemini-2.0-flash") 
 
 
 
+_MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".heic": "image/heic",
+    ".heif": "image/heif",
+}
+
 def _get_mime_type(file_path: str) -> str:
     ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".pdf": return "application/pdf"
-    elif ext == ".png": return "image/png"
-    elif ext in [".jpg", ".jpeg"]: return "image/jpeg"
-    elif ext == ".webp": return "image/webp"
-    elif ext == ".heic": return "image/heic"
-    elif ext == ".heif": return "image/heif"
-    else:
+    mime_type = _MIME_TYPES.get(ext)
+    if mime_type is None:
         print(f"Warning: Unknown MIME type for extension {ext} in {file_path}. Attempting application/octet-stream.")
         return "application/octet-stream"
+    return mime_type
 
 def _build_gemini_extraction_prompt(document_type: str) -> str:
+    doc_type = document_type.lower()
     doc_type_display = "document"
-    if document_type.lower() == "invoice":
+    if doc_type == "invoice":
         doc_type_display = "invoice"
-    elif document_type.lower() == "purchase_order":
+    elif doc_type == "purchase_order":
         doc_type_display = "purchase order"
     
    
@@ -51,7 +59,7 @@ def _build_gemini_extraction_prompt(document_type: str) -> str:
 
     # Add type-specific fields and instructions
     specific_instructions = ""
-    if document_type.lower() == "invoice":
+    if doc_type == "invoice":
         json_schema_description = f"""
     {{
       {base_schema_fields},
@@ -71,7 +79,7 @@ def _build_gemini_extraction_prompt(document_type: str) -> str:
     Then the JSON output should include:
     `"related_po_number": "CUST-ORDER-XYZ-789"`
         """
-    elif document_type.lower() == "purchase_order":
+    elif doc_type == "purchase_order":
         json_schema_description = f"""
     {{
       {base_schema_fields}
@@ -110,6 +118,31 @@ def _build_gemini_extraction_prompt(document_type: str) -> str:
     """
     return prompt.strip()
 
+# The prompt text depends only on the document type, so build each variant once
+# at import time instead of re-assembling the schema strings on every parse call.
+_EXTRACTION_PROMPTS = {
+    doc_type: _build_gemini_extraction_prompt(doc_type)
+    for doc_type in ("invoice", "purchase_order", "document")
+}
+
+def _get_extraction_prompt(document_type: str) -> str:
+    prompt = _EXTRACTION_PROMPTS.get(document_type.lower())
+    if prompt is None:
+        prompt = _EXTRACTION_PROMPTS["document"]
+    return prompt
+
+
+# GenerativeModel instances are stateless request factories; creating one per
+# parse call repeats the same client/config setup. Cache per model name.
+_MODEL_INSTANCE_CACHE: Dict[str, Any] = {}
+
+def _get_generative_model(model_name: str):
+    model = _MODEL_INSTANCE_CACHE.get(model_name)
+    if model is None:
+        model = genai.GenerativeModel(model_name=model_name)
+        _MODEL_INSTANCE_CACHE[model_name] = model
+        print(f"GEMINI_PARSER: Initialized and cached model instance for '{model_name}'")
+    return model
 
 def parse_document_with_gemini(file_path: str, document_type: str) -> Dict[str, Any]:
     current_model_name = MODEL_NAME_FROM_ENV 
@@ -120,46 +153,50 @@ def parse_document_with_gemini(file_path: str, document_type: str) -> Dict[str,
     if not current_model_name:
         return {"error": "MODEL_NAME not configured for Gemini parser. Cannot proceed."}
 
-    generative_model_instance = None 
+    generative_model_instance = None
     try:
-        generative_model_instance = genai.GenerativeModel(
-            model_name=current_model_name,
-        )
-        print(f"GEMINI_PARSER: Successfully initialized model instance for '{current_model_name}'")
+        generative_model_instance = _get_generative_model(current_model_name)
 
         with open(file_path, "rb") as f:
             file_bytes = f.read()
         
         mime_type = _get_mime_type(file_path)
-        if mime_type == "application/octet-stream" and not any(file_path.lower().endswith(ext) for ext in [".pdf", ".png", ".jpg", ".jpeg", ".webp", ".heic", ".heif"]):
+        if mime_type == "application/octet-stream" and not any(file_path.lower().endswith(ext) for ext in _MIME_TYPES):
              print(f"GEMINI_PARSER: Passing file {file_path} with generic MIME type {mime_type} to Gemini as it's an unknown common type.")
 
         document_part = {"mime_type": mime_type, "data": file_bytes}
-        prompt = _build_gemini_extraction_prompt(document_type) # This now generates type-specific prompt
+        prompt = _get_extraction_prompt(document_type) # Type-specific prompt, prebuilt at import
         
         print(f"GEMINI_PARSER: Sending request to Gemini for {file_path}...")
         response = generative_model_instance.generate_content([prompt, document_part])
 
-        extracted_json_str = ""
         if not response.parts:
             print("GEMINI_PARSER: Gemini response had no parts.")
             error_message = "No content parts returned from Gemini."
-            if hasattr(response, 'prompt_feedback') and response.prompt_feedback and response.prompt_feedback.block_reason:
-                error_message = f"Content generation blocked. Reason: {response.prompt_feedback.block_reason}."
-                if hasattr(response.prompt_feedback, 'safety_ratings') and response.prompt_feedback.safety_ratings:
-                    error_message += f" Safety Ratings: {response.prompt_feedback.safety_ratings}"
-            elif hasattr(response, 'candidates') and response.candidates and response.candidates[0].finish_reason.name != "STOP":
-                 error_message = f"Content generation finished with reason: {response.candidates[0].finish_reason.name}."
+            # Bind the optional response attributes once instead of re-probing
+            # them with hasattr before every use.
+            prompt_feedback = getattr(response, 'prompt_feedback', None)
+            candidates = getattr(response, 'candidates', None)
+            if prompt_feedback and prompt_feedback.block_reason:
+                error_message = f"Content generation blocked. Reason: {prompt_feedback.block_reason}."
+                safety_ratings = getattr(prompt_feedback, 'safety_ratings', None)
+                if safety_ratings:
+                    error_message += f" Safety Ratings: {safety_ratings}"
+            elif candidates and candidates[0].finish_reason.name != "STOP":
+                 error_message = f"Content generation finished with reason: {candidates[0].finish_reason.name}."
             print(f"GEMINI_PARSER: {error_message}")
             return {"error": error_message, "raw_response": str(response)}
 
         try:
-            extracted_json_str = response.text 
+            extracted_json_str = response.text
         except ValueError as ve:
             print(f"GEMINI_PARSER: Could not directly get .text from response (ValueError: {ve}). Inspecting parts.")
+            text_pieces = []
             for part in response.parts:
-                if hasattr(part, "text"): extracted_json_str += part.text
+                part_text = getattr(part, "text", None)
+                if part_text is not None: text_pieces.append(part_text)
                 else: print(f"GEMINI_PARSER: Encountered non-text part: {type(part)}")
+            extracted_json_str = "".join(text_pieces)
         
         if not extracted_json_str.strip():
             print("GEMINI_PARSER: Extracted text from Gemini response is empty.")
@@ -188,19 +225,41 @@ def parse_document_with_gemini(file_path: str, document_type: str) -> Dict[str,
              error_detail += f" Failed to initialize Gemini model '{current_model_name}'. Check API Key and model name."
         return {"error": error_detail}
 
+def _as_float(value) -> float:
+    """Coerces an extracted amount to float, deciding by type up front.
+
+    Gemini returns numbers for the amount fields in the common case; checking
+    the type once avoids speculative float() calls and keeps a malformed
+    string (e.g. "N/A") from blowing up the whole payload assembly.
+    """
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    if value:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            print(f"GEMINI_PARSER: Warning - Non-numeric amount value {value!r}; using 0.0.")
+    return 0.0
+
 # ... process_raw_document_to_json function remains the same, but it will now pass the correct "purchase_order" type ...
 # and the `gemini_extracted_data` will reflect the schema used for POs (i.e., no `related_invoice_number` unless you add it back for other reasons)
 def process_raw_document_to_json(raw_document_file_path: str, document_type: str) -> Dict[str, Any]:
     if not os.path.exists(raw_document_file_path):
         return {"status": "error", "error_message": f"Raw document file not found: {raw_document_file_path}"}
+    doc_type = document_type.lower() # Normalize once; used for the branches below
 
     print(f"PROCESSOR: Starting Gemini extraction for: {raw_document_file_path} as type '{document_type}'") # Log the type
     gemini_extracted_data = parse_document_with_gemini(raw_document_file_path, document_type)
 
-    if "error" in gemini_extracted_data:
+    # One hash lookup instead of a membership test followed by a second .get
+    # for the same key.
+    error_value = gemini_extracted_data.get("error", _MISSING)
+    if error_value is not _MISSING:
         return {
             "status": "error",
-            "error_message": f"Gemini parsing failed: {gemini_extracted_data.get('error', 'Unknown Gemini error')}",
+            "error_message": f"Gemini parsing failed: {error_value}",
             "raw_gemini_response": gemini_extracted_data.get('raw_response')
         }
     else:
@@ -208,14 +267,14 @@ def process_raw_document_to_json(raw_document_file_path: str, document_type: str
             "document_number": gemini_extracted_data.get("document_number"),
             "vendor_name": gemini_extracted_data.get("vendor_name"),
             "date": gemini_extracted_data.get("date"),
-            "total_amount": float(gemini_extracted_data.get("total_amount", 0.0) or 0.0),
-            "subtotal": float(gemini_extracted_data.get("subtotal", 0.0) or 0.0),
-            "tax_amount": float(gemini_extracted_data.get("tax_amount", 0.0) or 0.0),
+            "total_amount": _as_float(gemini_extracted_data.get("total_amount")),
+            "subtotal": _as_float(gemini_extracted_data.get("subtotal")),
+            "tax_amount": _as_float(gemini_extracted_data.get("tax_amount")),
             "line_items": gemini_extracted_data.get("line_items", []),
             "confidence_score": gemini_extracted_data.get("confidence_score", 0.85) 
         }
         
-        if document_type.lower() == "invoice":
+        if doc_type == "invoice":
             data_payload["related_po_number"] = gemini_extracted_data.get("related_po_number")
     
         
@@ -225,3 +284,14 @@ def process_raw_document_to_json(raw_document_file_path: str, document_type: str
             "data": data_payload
         }
 
+
+async def process_raw_document_to_json_async(raw_document_file_path: str, document_type: str) -> Dict[str, Any]:
+    """Async counterpart of process_raw_document_to_json.
+
+    The Gemini call inside is blocking and can take seconds; async callers
+    (the agent tools all run on an event loop) should use this entry point so
+    the extraction runs in a worker thread instead of each caller spelling out
+    the to_thread dispatch itself.
+    """
+    return await asyncio.to_thread(process_raw_document_to_json, raw_document_file_path, document_type)
+